@@ -1,5 +1,7 @@
 # frontend/app.py
 import os
+import time
+import uuid
 from datetime import datetime
 
 import streamlit as st
@@ -7,10 +9,14 @@ from dotenv import load_dotenv
 import pandas as pd
 
 from services import (
+    MAX_ACTIONS,
     get_actions,
-    execute_action,
+    get_action_stats,
+    approve_actions,
     execute_all_actions,
+    get_job,
     simulate_meeting_end,
+    action_watcher,
 )
 
 load_dotenv()
@@ -305,21 +311,86 @@ st.markdown(
 )
 
 # ---------- HELPER FUNCTIONS ----------
-def format_confidence(conf_raw):
-    if conf_raw is None:
-        return "N/A"
-    if conf_raw <= 1:
-        conf_raw *= 100
-    return f"{conf_raw:.0f}%"
+STATUS_LABELS = {"staged": "Staged", "executed": "Executed", "failed": "Failed"}
+PAGE_ROWS = int(os.getenv("FRONTEND_PAGE_ROWS", 50))
+# how often each session checks the (local) watcher for a newer backend version
+LIVE_CHECK_SECONDS = float(os.getenv("FRONTEND_LIVE_CHECK_SECONDS", 1))
+ACTION_FIELDS = [
+    "id", "type", "summary", "title", "assignee", "due_date",
+    "confidence", "status", "snippet", "duplicate_of",
+]
+
+
+@st.cache_data(max_entries=4, show_spinner=False)
+def build_frame(version, _actions):
+    """
+    Normalize the action list once into typed columns; reruns reuse it until
+    the data version changes (`_actions` is not hashed, `version` is).
+    """
+    raw = pd.DataFrame.from_records(_actions, columns=ACTION_FIELDS)
+    status = raw["status"].fillna("staged").str.lower()
+    action_type = raw["type"].fillna("").str.lower()
+    conf = pd.to_numeric(raw["confidence"], errors="coerce")
+    # backend sends 0-1; tolerate 0-100
+    pct = conf.where(conf > 1, conf * 100)
+    summary = raw["summary"].mask(raw["summary"].eq("")).fillna(raw["title"])
+
+    return pd.DataFrame(
+        {
+            "id": raw["id"],
+            "Approve": False,
+            "Type": action_type.str.capitalize().replace("", "N/A"),
+            "Summary": summary.fillna("No summary"),
+            "Assignee": raw["assignee"].fillna("Unassigned"),
+            "Due Date": raw["due_date"].fillna("Not set"),
+            "Confidence": (pct.round().astype("Int64").astype(str) + "%").where(pct.notna(), "N/A"),
+            "Status": status.map(STATUS_LABELS).fillna("Staged"),
+            "Snippet": raw["snippet"].fillna(""),
+            "Duplicate Of": raw["duplicate_of"].fillna(""),
+            "_status": status.astype("category"),
+            "_type": action_type.astype("category"),
+            "_pct": pct,
+        }
+    )
+
+
+@st.fragment(run_every=LIVE_CHECK_SECONDS)
+def live_updates(watcher):
+    # the backend pushes changes to `watcher`; rerun the whole app only once its version moved
+    if watcher.version != st.session_state.get("rendered_version"):
+        st.rerun()
+    st.caption("Live" if watcher.connected else "Live updates connecting...")
+
+
+JOB_POLL_SECONDS = float(os.getenv("FRONTEND_JOB_POLL_SECONDS", 60))
+
+
+def submission_key(name):
+    # reused until the backend accepts the job, so a retry after a timeout cannot execute twice
+    return st.session_state.setdefault(f"{name}_key", str(uuid.uuid4()))
+
+
+def wait_for_job(job, label):
+    """Poll an execution job with a progress bar; returns the last snapshot."""
+    bar = st.progress(job.get("progress", 0.0), text=label)
+    deadline = time.time() + JOB_POLL_SECONDS
+    while job.get("status") != "completed" and time.time() < deadline:
+        time.sleep(0.5)
+        job = get_job(job["job_id"])
+        done = job["total"] - job["counts"]["queued"] - job["counts"]["running"]
+        bar.progress(job["progress"], text=f"{label}: {done}/{job['total']}")
+    return job
 
 
-def status_badge(status):
-    status = (status or "staged").lower()
-    if status == "executed":
-        return "Executed"
-    if status == "failed":
-        return "Failed"
-    return "Staged"
+def job_errors(job):
+    if not (job["counts"]["failed"] or job["counts"]["skipped"]):
+        return []
+    items = get_job(job["job_id"], items=True)["items"]
+    return [
+        f"{i['action_id']}: {i['error']}"
+        for i in items
+        if i["status"] in ("failed", "skipped")
+    ]
 
 
 # ---------- SIDEBAR ----------
@@ -329,9 +400,9 @@ st.sidebar.markdown("---")
 # Simulate button – safe wrapper
 if st.sidebar.button("Simulate Meeting End"):
     try:
-        with st.spinner("Processing meeting transcript..."):
+        with st.spinner("Sending meeting transcript..."):
             simulate_meeting_end(demo_flag=True)
-        st.sidebar.success("Demo meeting processed. Use Refresh to load new actions.")
+        st.sidebar.success("Demo meeting queued. Its actions appear here once it has been parsed.")
     except Exception:
         st.sidebar.error("Backend error while processing meeting. Please ask backend owner to check logs.")
 
@@ -352,6 +423,13 @@ type_filter = st.sidebar.multiselect(
 
 min_conf = st.sidebar.slider("Minimum Confidence (%)", 0, 100, 0)
 
+watcher = action_watcher()
+# read before loading: a change that lands mid-load triggers one more rerun, never a missed one
+st.session_state["rendered_version"] = watcher.version
+if st.sidebar.toggle("Live updates", value=True, disabled=not watcher.available) and watcher.available:
+    with st.sidebar:
+        live_updates(watcher)
+
 st.sidebar.markdown("---")
 st.sidebar.subheader("Statistics")
 
@@ -365,29 +443,43 @@ with col2:
         st.rerun()
 
 # ---------- LOAD ACTIONS ----------
+# the backend filters, so older matches are not crowded out by the newest MAX_ACTIONS rows;
+# services keeps one delta-synced copy per filter setting
 with st.spinner("Loading actions..."):
     try:
-        actions = get_actions()
+        if status_filter:
+            actions, version = get_actions(
+                status=status_filter,
+                types=type_filter,
+                min_confidence=min_conf / 100 if min_conf else None,
+                with_version=True,
+            )
+        else:
+            actions, version = [], "empty"
+        stats = get_action_stats()
         last_loaded = datetime.now()
     except Exception as e:
         st.error(f"Unable to load actions: {e}")
-        actions = []
+        actions, version = [], "empty"
+        stats = {}
         last_loaded = None
 
 if last_loaded:
     st.caption(f"Last updated: {last_loaded.strftime('%H:%M:%S')}")
 
+frame = build_frame(version, actions)
+
 # ---------- CALCULATE STATS ----------
-total_actions = len(actions)
-staged_actions = sum(
-    1 for a in actions if (a.get("status") or "staged").lower() == "staged"
-)
-executed_actions = sum(
-    1 for a in actions if (a.get("status") or "").lower() == "executed"
-)
-failed_actions = sum(
-    1 for a in actions if (a.get("status") or "").lower() == "failed"
-)
+# totals over every action come from the backend; the local copy is filtered and capped (FRONTEND_MAX_ACTIONS)
+if stats:
+    total_actions = stats.get("total", 0)
+    by_status = stats.get("by_status", {})
+else:
+    total_actions = len(frame)
+    by_status = frame["_status"].value_counts()
+staged_actions = int(by_status.get("staged", 0))
+executed_actions = int(by_status.get("executed", 0))
+failed_actions = int(by_status.get("failed", 0))
 
 # Sidebar stats
 st.sidebar.metric("Total Actions", total_actions)
@@ -410,39 +502,14 @@ c4.metric("Failed", failed_actions)
 st.markdown("---")
 
 # ---------- FILTER ACTIONS ----------
-rows = []
-for a in actions:
-    status = (a.get("status") or "staged").lower()
-    if status not in status_filter:
-        continue
-
-    action_type = (a.get("type") or "").lower()
-    if type_filter and action_type not in type_filter:
-        continue
-
-    conf_raw = a.get("confidence")
-    pct_val = conf_raw * 100 if conf_raw is not None and conf_raw <= 1 else conf_raw
-    if pct_val is not None and pct_val < min_conf:
-        continue
-
-    rows.append(
-        {
-            "id": a.get("id"),
-            "Approve": False,
-            "Type": action_type.capitalize() if action_type else "N/A",
-            "Summary": a.get("summary") or a.get("title") or "No summary",
-            "Assignee": a.get("assignee") or "Unassigned",
-            "Due Date": a.get("due_date") or "Not set",
-            "Confidence": format_confidence(conf_raw),
-            "Status": status_badge(status),
-            "Snippet": a.get("snippet") or "",
-            "_raw_conf": conf_raw,
-        }
-    )
+# already filtered by the backend
+view = frame
 
-if not rows:
+if view.empty:
     st.info("No actions match the current filters.")
     st.stop()
+if len(actions) >= MAX_ACTIONS:
+    st.caption(f"Showing the newest {MAX_ACTIONS} matching actions; narrow the filters to see older ones.")
 
 # ---------- TABLE ----------
 st.subheader("Actions")
@@ -452,10 +519,18 @@ st.info(
     "Check the Approve box for actions you want to execute."
 )
 
-df = pd.DataFrame(rows)
+page_count = max(1, -(-len(view) // PAGE_ROWS))
+if page_count > 1:
+    page = st.number_input(
+        f"Page (of {page_count}, {len(view)} actions)",
+        min_value=1, max_value=page_count, value=1, step=1,
+    )
+else:
+    page = 1
+page_df = view.iloc[(page - 1) * PAGE_ROWS : page * PAGE_ROWS]
 
 edited_df = st.data_editor(
-    df,
+    page_df,
     hide_index=True,
     column_config={
         "Approve": st.column_config.CheckboxColumn("Approve", default=False),
@@ -468,10 +543,15 @@ edited_df = st.data_editor(
         ),
         "Status": st.column_config.TextColumn("Status", disabled=True),
         "Snippet": st.column_config.TextColumn("Snippet", disabled=True),
+        "Duplicate Of": st.column_config.TextColumn(
+            "Duplicate Of", disabled=True, help="Earlier action this restates; skipped on execution"
+        ),
         "id": None,
-        "_raw_conf": None,
+        "_status": None,
+        "_type": None,
+        "_pct": None,
     },
-    disabled=["id", "_raw_conf", "Type", "Confidence", "Status", "Snippet"],
+    disabled=["id", "_status", "_type", "_pct", "Type", "Confidence", "Status", "Snippet", "Duplicate Of"],
     use_container_width=True,
 )
 
@@ -492,32 +572,41 @@ with col1:
         use_container_width=True,
     ):
         try:
-            selected_ids = [
-                row["id"]
-                for _, row in edited_df.iterrows()
-                if row.get("Approve", False)
-            ]
+            selected_ids = edited_df.loc[edited_df["Approve"], "id"].tolist()
             if not selected_ids:
                 st.warning("No actions selected")
             else:
-                with st.spinner(f"Executing {len(selected_ids)} actions..."):
-                    errors = []
-                    success_count = 0
-                    for action_id in selected_ids:
-                        try:
-                            execute_action(action_id)
-                            success_count += 1
-                        except Exception as e:
-                            errors.append(f"{action_id}: {str(e)}")
-
-                    if errors:
-                        st.error(f"{len(errors)} actions failed")
-                        for err in errors:
-                            st.error(err)
-                    if success_count > 0:
-                        st.success(
-                            f"{success_count} actions executed successfully"
-                        )
+                label = f"Executing {len(selected_ids)} actions"
+                bar = st.progress(0.0, text=label)
+                results = approve_actions(
+                    selected_ids,
+                    idempotency_key=submission_key("approve"),
+                    on_progress=lambda job: bar.progress(job["progress"], text=label),
+                    wait_seconds=JOB_POLL_SECONDS,
+                )
+                st.session_state.pop("approve_key", None)
+
+                errors = [
+                    f"{action_id}: {r['error']}"
+                    for action_id, r in results.items()
+                    if r["ok"] is False
+                ]
+                pending = sum(1 for r in results.values() if r["ok"] is None)
+                success_count = sum(1 for r in results.values() if r["ok"])
+                if errors:
+                    st.error(f"{len(errors)} actions failed")
+                    for err in errors:
+                        st.error(err)
+                if pending:
+                    st.info(
+                        f"{pending} actions still running in the background. "
+                        "Use Refresh to see the latest status."
+                    )
+                elif success_count > 0:
+                    st.success(
+                        f"{success_count} actions executed successfully"
+                    )
+                if not pending and not errors:
                     st.rerun()
         except Exception as e:
             st.error(f"Error: {str(e)}")
@@ -529,13 +618,28 @@ with col2:
         if staged_actions == 0:
             st.warning("No staged actions")
         else:
-            with st.spinner(f"Executing all {staged_actions} actions..."):
-                try:
-                    execute_all_actions()
-                    st.success(f"All {staged_actions} actions executed")
-                    st.rerun()
-                except Exception as e:
-                    st.error(f"Error: {str(e)}")
+            try:
+                job = execute_all_actions(
+                    idempotency_key=submission_key("approve_all")
+                )
+                st.session_state.pop("approve_all_key", None)
+                job = wait_for_job(job, f"Executing all {staged_actions} actions")
+                failed = job["counts"]["failed"]
+                if failed:
+                    st.error(f"{failed} actions failed")
+                    for err in job_errors(job):
+                        st.error(err)
+                if job["status"] != "completed":
+                    st.info(
+                        f"Still running in the background (job {job['job_id']}). "
+                        "Use Refresh to see the latest status."
+                    )
+                else:
+                    st.success(f"{job['counts']['succeeded']} actions executed")
+                    if not failed:
+                        st.rerun()
+            except Exception as e:
+                st.error(f"Error: {str(e)}")
 
 st.markdown("---")
 
@@ -564,6 +668,7 @@ if len(edited_df) > 0:
         <p><strong>Due Date:</strong> {row['Due Date']}</p>
         <p><strong>Confidence:</strong> {row['Confidence']}</p>
         <p><strong>Status:</strong> {row['Status']}</p>
+        {f"<p><strong>Duplicate of:</strong> {row['Duplicate Of']} (skipped on execution)</p>" if row['Duplicate Of'] else ""}
     </div>
     """,
         unsafe_allow_html=True,
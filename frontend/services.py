@@ -1,9 +1,30 @@
 import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
 import requests
-from typing import List, Dict, Any
+from requests.adapters import HTTPAdapter
+from typing import Callable, List, Dict, Any, Optional
 import streamlit as st
 
 BACKEND_URL = os.getenv("FRONTEND_BACKEND_URL", "http://localhost:8000")
+PAGE_SIZE = 500
+# upper bound on rows pulled into the dashboard per rerun
+MAX_ACTIONS = int(os.getenv("FRONTEND_MAX_ACTIONS", 5000))
+# fan-out width when the backend has no batch execute endpoint
+APPROVAL_CONCURRENCY = int(os.getenv("FRONTEND_APPROVAL_CONCURRENCY", 16))
+
+
+@st.cache_resource
+def _session() -> requests.Session:
+    """One keep-alive connection pool for every call to the backend, shared across reruns and sessions."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=APPROVAL_CONCURRENCY)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
 
 def _handle_request_error(error: Exception, action: str):
     """Centralized error handling with user-friendly messages"""
@@ -25,12 +46,27 @@ def _handle_request_error(error: Exception, action: str):
     raise error
 
 
-def get_actions() -> List[Dict[str, Any]]:
+def get_actions(
+    status: Optional[List[str]] = None,
+    types: Optional[List[str]] = None,
+    min_confidence: Optional[float] = None,
+    sort: str = "created_at",
+    max_items: int = MAX_ACTIONS,
+    with_version: bool = False,
+):
     """
-    Get staged actions from the backend.
+    Get staged actions from the backend, filtered and sorted server-side.
+    
+    Args:
+        status: Only these statuses (staged, executed, failed)
+        types: Only these types (email, jira, calendar)
+        min_confidence: Minimum confidence, 0-1
+        sort: created_at, updated_at, confidence or due_date (newest/highest first)
+        max_items: Stop following pages after this many actions
+        with_version: Also return a version string that changes only when the list does
     
     Returns:
-        List of action dictionaries with fields:
+        List (or (list, version) with with_version) of action dictionaries with fields:
         - id: Action identifier
         - type: Action type (email, jira, calendar)
         - summary/title: Brief description
@@ -43,33 +79,185 @@ def get_actions() -> List[Dict[str, Any]]:
     Raises:
         requests.exceptions.RequestException: If request fails
     """
+    filters = {}
+    if status:
+        filters["status"] = ",".join(status)
+    if types:
+        filters["type"] = ",".join(types)
+    if min_confidence:
+        filters["min_confidence"] = min_confidence
+    key = ("actions", tuple(sorted(filters.items())), sort, max_items)
     try:
-        resp = requests.get(
+        copy = _session_cache().get(key)
+        if copy is None:
+            copy = _session_cache()[key] = _load_actions(filters, sort, max_items)
+        else:
+            _sync_actions(copy, filters, sort, max_items)
+        if with_version:
+            return copy["list"], f"{key}@{copy['sync']}"
+        return copy["list"]
+    except Exception as e:
+        _handle_request_error(e, "Fetching actions")
+
+
+def _session_cache() -> Dict[Any, Any]:
+    # per-browser-session copy of backend data, patched with deltas on each rerun
+    return st.session_state.setdefault("_backend_cache", {})
+
+
+def _sorted_actions(rows: Dict[str, Dict[str, Any]], sort: str, max_items: int) -> List[Dict[str, Any]]:
+    # same order as the backend: newest / highest first, missing due dates last
+    ordered = sorted(
+        rows.values(),
+        key=lambda a: (a.get(sort) if a.get(sort) is not None else "", a["id"]),
+        reverse=True,
+    )
+    return ordered[:max_items]
+
+
+def _load_actions(filters: Dict[str, Any], sort: str, max_items: int) -> Dict[str, Any]:
+    params = {**filters, "sort": sort, "limit": min(PAGE_SIZE, max_items)}
+    rows, sync = {}, None
+    while True:
+        resp = _session().get(
             f"{BACKEND_URL}/api/actions", 
+            params=params,
             timeout=10,
             headers={"Accept": "application/json"}
         )
         resp.raise_for_status()
-        return resp.json()
+        rows.update((a["id"], a) for a in resp.json())
+        # the first page's version is the oldest; syncing from it cannot miss a change
+        sync = sync or resp.headers.get("X-Sync-Cursor")
+        # the backend pages with a cursor header; follow it up to max_items
+        cursor = resp.headers.get("X-Next-Cursor")
+        if not cursor or len(rows) >= max_items:
+            break
+        params["cursor"] = cursor
+    return {"rows": rows, "sync": sync, "list": _sorted_actions(rows, sort, max_items)}
+
+
+def _sync_actions(copy: Dict[str, Any], filters: Dict[str, Any], sort: str, max_items: int):
+    """Patch a session copy with what changed since its sync cursor; 304 when nothing did."""
+    changed = False
+    while True:
+        resp = _session().get(
+            f"{BACKEND_URL}/api/actions", 
+            params={**filters, "since": copy["sync"] or 0, "limit": PAGE_SIZE},
+            timeout=10,
+            headers={"Accept": "application/json"}
+        )
+        resp.raise_for_status()
+        copy["sync"] = resp.headers.get("X-Sync-Cursor", copy["sync"])
+        if resp.status_code == 304:
+            break
+        for action in resp.json():
+            changed = True
+            if action.get("deleted"):
+                copy["rows"].pop(action["id"], None)
+            else:
+                copy["rows"][action["id"]] = action
+        if not resp.headers.get("X-Next-Cursor"):
+            break
+    if changed:
+        copy["list"] = _sorted_actions(copy["rows"], sort, max_items)
+
+
+def get_action_stats() -> Dict[str, Any]:
+    """
+    Action counts computed by the backend.
+    
+    Returns:
+        {"total": int, "by_status": {status: count}, "by_type": {type: count}}
+    """
+    cached = _session_cache().get("stats")
+    headers = {"Accept": "application/json"}
+    if cached:
+        headers["If-None-Match"] = cached["etag"]
+    try:
+        resp = _session().get(
+            f"{BACKEND_URL}/api/actions/stats", 
+            timeout=5,
+            headers=headers
+        )
+        resp.raise_for_status()
+        if resp.status_code == 304:
+            return cached["stats"]
+        stats = resp.json()
+        if resp.headers.get("ETag"):
+            _session_cache()["stats"] = {"etag": resp.headers["ETag"], "stats": stats}
+        return stats
     except Exception as e:
-        _handle_request_error(e, "Fetching actions")
+        _handle_request_error(e, "Fetching action stats")
+
+
+class ActionWatcher:
+    """
+    Follows the backend's /api/actions/events stream on a background thread.
+    
+    One stream per frontend process: it only records the latest store version,
+    and each session compares that against what it last rendered. Reconnects
+    with Last-Event-ID after errors; stops for good if the backend has no
+    events endpoint (available turns False).
+    """
+
+    def __init__(self):
+        self.version: Optional[int] = None
+        self.available = True
+        self.connected = False
+        self._thread = threading.Thread(target=self._run, name="action-watcher", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        delay = 1.0
+        while True:
+            try:
+                self._follow()
+                delay = 1.0
+            except requests.exceptions.HTTPError as e:
+                if e.response is not None and e.response.status_code in (404, 405):
+                    self.available = False
+                    return
+            except requests.exceptions.RequestException:
+                pass
+            self.connected = False
+            time.sleep(delay)
+            delay = min(delay * 2, 30.0)
+
+    def _follow(self):
+        headers = {"Accept": "text/event-stream"}
+        if self.version is not None:
+            headers["Last-Event-ID"] = str(self.version)
+        # the backend sends a keepalive every ~15s, so a silent minute means a dead connection
+        with requests.get(f"{BACKEND_URL}/api/actions/events", headers=headers, stream=True, timeout=(5, 60)) as resp:
+            resp.raise_for_status()
+            self.connected = True
+            for line in resp.iter_lines(decode_unicode=True):
+                if line and line.startswith("id:"):
+                    self.version = int(line[3:].strip())
+
+
+@st.cache_resource
+def action_watcher() -> ActionWatcher:
+    """The process-wide ActionWatcher, started on first use."""
+    return ActionWatcher()
 
 
 def execute_action(action_id: str) -> Dict[str, Any]:
     """
-    Execute a single action by ID.
+    Queue execution of a single action by ID.
     
     Args:
         action_id: The unique identifier of the action to execute
     
     Returns:
-        Response dictionary from backend
+        Job dictionary from backend (poll it with get_job)
     
     Raises:
         requests.exceptions.RequestException: If request fails
     """
     try:
-        resp = requests.post(
+        resp = _session().post(
             f"{BACKEND_URL}/api/actions/{action_id}/execute", 
             timeout=10,
             headers={"Accept": "application/json"}
@@ -80,21 +268,59 @@ def execute_action(action_id: str) -> Dict[str, Any]:
         _handle_request_error(e, f"Executing action {action_id}")
 
 
-def execute_all_actions() -> Dict[str, Any]:
+def execute_actions(action_ids: List[str], idempotency_key: Optional[str] = None) -> Dict[str, Any]:
     """
-    Execute all staged actions at once.
+    Queue one server-side job executing all the given actions.
+    
+    Args:
+        action_ids: Actions to execute
+        idempotency_key: Resubmitting with the same key returns the original job
+            instead of executing twice (e.g. after a timeout or a double click)
     
     Returns:
-        Response dictionary from backend
+        Job dictionary: job_id, status, total, counts, progress
     
     Raises:
         requests.exceptions.RequestException: If request fails
     """
     try:
-        resp = requests.post(
+        return _submit_job(action_ids, idempotency_key)
+    except Exception as e:
+        _handle_request_error(e, "Executing selected actions")
+
+
+def _submit_job(action_ids: List[str], idempotency_key: Optional[str]) -> Dict[str, Any]:
+    resp = _session().post(
+        f"{BACKEND_URL}/api/actions/execute", 
+        json={"ids": list(action_ids)},
+        timeout=10,
+        headers={
+            "Accept": "application/json",
+            "Idempotency-Key": idempotency_key or str(uuid.uuid4()),
+        }
+    )
+    resp.raise_for_status()
+    return resp.json()
+
+
+def execute_all_actions(idempotency_key: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Queue execution of all staged actions as one server-side job.
+    
+    Returns:
+        Job dictionary: job_id, status, total, counts, progress
+    
+    Raises:
+        requests.exceptions.RequestException: If request fails
+    """
+    try:
+        resp = _session().post(
             f"{BACKEND_URL}/api/actions/execute_all", 
-            timeout=30,  # Longer timeout for batch operations
-            headers={"Accept": "application/json"}
+            timeout=10,
+            headers={
+                "Accept": "application/json",
+                "Idempotency-Key": idempotency_key or str(uuid.uuid4()),
+            }
         )
         resp.raise_for_status()
         return resp.json()
@@ -102,29 +328,127 @@ def execute_all_actions() -> Dict[str, Any]:
         _handle_request_error(e, "Executing all actions")
 
 
+def get_job(job_id: str, items: bool = False) -> Dict[str, Any]:
+    """
+    Progress of an execution job.
+    
+    Args:
+        job_id: Returned by execute_action / execute_actions / execute_all_actions
+        items: Include per-action results (status, error)
+    
+    Returns:
+        Job dictionary; status is queued, running or completed
+    
+    Raises:
+        requests.exceptions.RequestException: If request fails
+    """
+    try:
+        resp = _session().get(
+            f"{BACKEND_URL}/api/jobs/{job_id}", 
+            params={"items": "true"} if items else None,
+            timeout=5,
+            headers={"Accept": "application/json"}
+        )
+        resp.raise_for_status()
+        return resp.json()
+    except Exception as e:
+        _handle_request_error(e, f"Fetching job {job_id}")
+
+
+def approve_actions(
+    action_ids: List[str],
+    idempotency_key: Optional[str] = None,
+    on_progress: Optional[Callable[[Dict[str, Any]], None]] = None,
+    wait_seconds: float = 60,
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Execute many actions with one batched request and report per-id results.
+    
+    Sends a single execution job and polls it; against a backend without the
+    batch endpoint, falls back to execute_action calls over a bounded thread pool.
+    
+    Args:
+        action_ids: Actions to execute
+        idempotency_key: Resubmitting with the same key cannot execute twice
+        on_progress: Called with each job snapshot while waiting
+        wait_seconds: Stop polling after this long (the job keeps running server-side)
+    
+    Returns:
+        {action_id: {"ok": True/False, or None while still running, "status": str, "error": str or None}}
+    
+    Raises:
+        requests.exceptions.RequestException: If the batch request fails
+    """
+    try:
+        job = _submit_job(action_ids, idempotency_key)
+    except requests.exceptions.HTTPError as e:
+        if e.response is not None and e.response.status_code in (404, 405):
+            return _approve_each(action_ids)
+        _handle_request_error(e, "Executing selected actions")
+    except Exception as e:
+        _handle_request_error(e, "Executing selected actions")
+
+    deadline = time.time() + wait_seconds
+    while job.get("status") != "completed" and time.time() < deadline:
+        if on_progress:
+            on_progress(job)
+        time.sleep(0.5)
+        job = get_job(job["job_id"])
+    if on_progress:
+        on_progress(job)
+
+    results = {}
+    for item in get_job(job["job_id"], items=True)["items"]:
+        status = item["status"]
+        results[item["action_id"]] = {
+            "ok": True if status == "succeeded" else (None if status in ("queued", "running") else False),
+            "status": status,
+            "error": item.get("error"),
+        }
+    return results
+
+
+def _approve_each(action_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+    def run(action_id):
+        try:
+            resp = _session().post(
+                f"{BACKEND_URL}/api/actions/{action_id}/execute", 
+                timeout=10,
+                headers={"Accept": "application/json"}
+            )
+            resp.raise_for_status()
+            return action_id, {"ok": True, "status": "succeeded", "error": None}
+        except requests.exceptions.RequestException as e:
+            return action_id, {"ok": False, "status": "failed", "error": str(e)}
+
+    with ThreadPoolExecutor(max_workers=APPROVAL_CONCURRENCY) as pool:
+        return dict(pool.map(run, action_ids))
+
+
 def simulate_meeting_end(demo_flag: bool = True) -> Dict[str, Any]:
     """
     Simulate a meeting end event to generate demo actions.
     
-    For demo purposes, the backend can ignore meeting_id and generate 
-    sample actions based on predefined templates.
+    The backend queues the meeting and answers right away; the actions show
+    up once a background worker has parsed it. Each call uses a fresh
+    meeting_id, since the webhook ignores repeated ones.
     
     Args:
-        demo_flag: If True, use demo/mock data
+        demo_flag: If True, the backend parses its demo transcript
     
     Returns:
-        Response dictionary from backend
+        The queued meeting job: meeting_id, status, priority, attempts, ...
     
     Raises:
         requests.exceptions.RequestException: If request fails
     """
     try:
         payload = {
-            "meeting_id": "demo-meeting-123", 
+            "meeting_id": f"demo-meeting-{uuid.uuid4().hex[:12]}",
             "demo": demo_flag,
-            "timestamp": requests.utils.default_headers()  # Add timestamp for uniqueness
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
         }
-        resp = requests.post(
+        resp = _session().post(
             f"{BACKEND_URL}/api/hooks/meeting", 
             json=payload, 
             timeout=15,
@@ -144,7 +468,7 @@ def check_backend_health() -> bool:
         True if backend is healthy, False otherwise
     """
     try:
-        resp = requests.get(
+        resp = _session().get(
             f"{BACKEND_URL}/health", 
             timeout=5
         )
@@ -161,7 +485,7 @@ def get_backend_info() -> Dict[str, Any]:
         Dictionary with backend info, or empty dict if unavailable
     """
     try:
-        resp = requests.get(
+        resp = _session().get(
             f"{BACKEND_URL}/info", 
             timeout=5
         )
@@ -0,0 +1,65 @@
+"""
+Push side of the action store. GET /api/actions/events follows the store's
+version column and streams each change as a server-sent event, so the
+dashboard no longer has to poll. Writes in this process wake subscribers at
+once; writes from other worker processes are picked up by a short poll of
+the indexed version column.
+"""
+import asyncio, os
+
+
+ACTION_EVENTS_POLL_S = float(os.getenv("ACTION_EVENTS_POLL_S", 1))
+# comment line sent on an idle stream so proxies keep it open
+ACTION_EVENTS_HEARTBEAT_S = float(os.getenv("ACTION_EVENTS_HEARTBEAT_S", 15))
+
+
+class ChangeFeed:
+    def __init__(self, store):
+        self.store = store
+        self._waiters = set()
+        self._loop = None
+        store.listeners.append(self._changed)
+
+    @property
+    def subscribers(self):
+        return len(self._waiters)
+
+    def _changed(self, version):
+        # runs in whichever thread committed the write
+        loop = self._loop
+        if loop is not None and not loop.is_closed():
+            loop.call_soon_threadsafe(self._wake)
+
+    def _wake(self):
+        for woken in self._waiters:
+            woken.set()
+
+    async def follow(self, since, filters=(), disconnected=None):
+        """
+        Yields (items, version) as the store changes after `since`; items are
+        store.changes() rows, and an empty list is a heartbeat. Ends when
+        `disconnected()` (an async callable) returns true.
+        """
+        self._loop = asyncio.get_running_loop()
+        woken = asyncio.Event()
+        self._waiters.add(woken)
+        try:
+            idle = 0.0
+            while not (disconnected and await disconnected()):
+                # cleared before reading, so a write racing the query wakes the next wait
+                woken.clear()
+                items, since, more = await asyncio.to_thread(self.store.changes, since, *filters)
+                if items:
+                    idle = 0.0
+                    yield items, since
+                if more:
+                    continue
+                try:
+                    await asyncio.wait_for(woken.wait(), ACTION_EVENTS_POLL_S)
+                except asyncio.TimeoutError:
+                    idle += ACTION_EVENTS_POLL_S
+                    if idle >= ACTION_EVENTS_HEARTBEAT_S:
+                        idle = 0.0
+                        yield [], since
+        finally:
+            self._waiters.discard(woken)
@@ -0,0 +1,390 @@
+import base64, hashlib, json, os, sqlite3, threading, time
+
+from result_cache import DATA_DIR
+
+
+# dashboard "type" = the connector that would execute the action
+CONNECTORS = ("email", "jira", "calendar")
+STATUSES = ("staged", "executed", "failed")
+
+# sortable columns -> SQL expression (due_date may be NULL; sort missing dates first)
+SORTS = {
+    "created_at": "created_at",
+    "updated_at": "updated_at",
+    "confidence": "confidence",
+    "due_date": "COALESCE(due_date, '')",
+}
+MAX_PAGE = 1000
+
+COLUMNS = ("id", "meeting_id", "action_id", "type", "kind", "summary", "assignee", "due_date",
+           "confidence", "status", "snippet", "tags", "duplicate_of", "created_at", "updated_at", "version", "event")
+# what the last write to a row was; pushed to dashboards as the SSE event name
+EVENTS = ("created", "updated", "executed", "failed")
+
+
+def _iso(ts):
+    return time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(ts))
+
+
+def connector_type(action):
+    tags = [t.lower() for t in action.get("tags") or []]
+    for connector in CONNECTORS:
+        if connector in tags:
+            return connector
+    metadata = action.get("metadata") or {}
+    if metadata.get("recipients"):
+        return "email"
+    if metadata.get("jira_project"):
+        return "jira"
+    return "other"
+
+
+def snippet_for(action, source_text):
+    if action.get("context"):
+        return action["context"]
+    span = action.get("source_span") or {}
+    start, end = span.get("start_char"), span.get("end_char")
+    if source_text and isinstance(start, int) and isinstance(end, int) and 0 <= start < end:
+        return source_text[start:end]
+    return ""
+
+
+def to_row(meeting_id, action, source_text=None):
+    """Flatten one schema action into the columns the dashboard filters and shows."""
+    names = [a.get("name") for a in action.get("assignees") or [] if a.get("name")]
+    return {
+        "id": f"{meeting_id}:{action['id']}",
+        "meeting_id": meeting_id,
+        "action_id": action["id"],
+        "type": connector_type(action),
+        "kind": action.get("type"),
+        "summary": action.get("text"),
+        "assignee": ", ".join(names) or None,
+        "due_date": action.get("due_date"),
+        "confidence": float(action.get("confidence") or 0),
+        "snippet": snippet_for(action, source_text),
+        "tags": json.dumps(action.get("tags") or []),
+        # store id of the earlier meeting's action this one restates (dedupe.py)
+        "duplicate_of": (action.get("metadata") or {}).get("duplicate_of"),
+        "payload": json.dumps(action, separators=(",", ":")),
+    }
+
+
+def content_key(row):
+    """What an action asks for, independent of the id the model gave it on one parse."""
+    return row["type"], row["kind"], " ".join((row["summary"] or "").lower().split())
+
+
+def _fresh_id(row):
+    # stable across re-parses, so the same action keeps landing on the same row
+    digest = hashlib.sha1(json.dumps(content_key(row)).encode("utf-8")).hexdigest()[:8]
+    return f"{row['id']}~{digest}"
+
+
+def _filters(status=None, types=None, min_confidence=None, meeting_id=None):
+    where, args = [], []
+    if status:
+        where.append(f"status IN ({','.join('?' * len(status))})")
+        args.extend(status)
+    if types:
+        where.append(f"type IN ({','.join('?' * len(types))})")
+        args.extend(types)
+    if min_confidence is not None:
+        where.append("confidence >= ?")
+        args.append(min_confidence)
+    if meeting_id:
+        where.append("meeting_id = ?")
+        args.append(meeting_id)
+    return where, args
+
+
+def encode_cursor(value, row_id):
+    raw = json.dumps([value, row_id], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        value, row_id = json.loads(raw)
+        return value, row_id
+    except (ValueError, TypeError):
+        raise ValueError("invalid cursor")
+
+
+class ActionStore:
+    """
+    Actions from validated /parse output, one row per (meeting_id, action id).
+    SQLite in WAL mode so every worker process shares it; indexed on the
+    columns the dashboard filters by, paginated by keyset cursor.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or os.getenv("ACTION_STORE_PATH", os.path.join(DATA_DIR, "actions.db"))
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, timeout=10, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        # called with the new max version after every committed write, from the writing thread
+        self.listeners = []
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS actions (
+                    id TEXT PRIMARY KEY,
+                    meeting_id TEXT NOT NULL,
+                    action_id TEXT NOT NULL,
+                    type TEXT NOT NULL,
+                    kind TEXT,
+                    summary TEXT,
+                    assignee TEXT,
+                    due_date TEXT,
+                    confidence REAL NOT NULL,
+                    status TEXT NOT NULL DEFAULT 'staged',
+                    snippet TEXT,
+                    tags TEXT,
+                    duplicate_of TEXT,
+                    payload TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL,
+                    version INTEGER NOT NULL DEFAULT 0,
+                    event TEXT NOT NULL DEFAULT 'created'
+                )"""
+            )
+            columns = {r[1] for r in self._conn.execute("PRAGMA table_info(actions)")}
+            if "version" not in columns:
+                # stores created before change tracking
+                self._conn.execute("ALTER TABLE actions ADD COLUMN version INTEGER NOT NULL DEFAULT 0")
+            if "event" not in columns:
+                self._conn.execute("ALTER TABLE actions ADD COLUMN event TEXT NOT NULL DEFAULT 'created'")
+            if "duplicate_of" not in columns:
+                self._conn.execute("ALTER TABLE actions ADD COLUMN duplicate_of TEXT")
+            for name, cols in (
+                ("status", "status, created_at, id"),
+                ("type", "type, created_at, id"),
+                ("status_confidence", "status, confidence, id"),
+                ("type_confidence", "type, confidence, id"),
+                ("confidence", "confidence, id"),
+                ("meeting", "meeting_id"),
+                ("created", "created_at, id"),
+                ("version", "version"),
+            ):
+                self._conn.execute(f"CREATE INDEX IF NOT EXISTS actions_{name} ON actions({cols})")
+            # rows a re-parse dropped; kept so delta sync and the change feed can report the removal
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS action_tombstones (id TEXT PRIMARY KEY, version INTEGER NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS action_tombstones_version ON action_tombstones(version)")
+
+    def upsert_document(self, doc):
+        """
+        Store every action of a validated document. Action ids depend on the
+        extraction path, so a re-parse is matched to what is stored by content:
+        an action that was already executed keeps its row untouched, a new
+        action whose id is taken by an executed one gets a fresh id, and a
+        staged or failed row whose content changed goes back to staged. The
+        meeting's actions that are not executed and are missing from the new
+        document are removed, so a stale copy is never executed twice.
+        """
+        meeting_id = doc["meeting_id"]
+        now = time.time()
+        rows = [to_row(meeting_id, a, doc.get("source_text")) for a in doc.get("actions", [])]
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                existing = {
+                    r["id"]: r for r in self._conn.execute(
+                        "SELECT id, type, kind, summary, status FROM actions WHERE meeting_id = ?", (meeting_id,)
+                    )
+                }
+                by_content = {}
+                for r in sorted(existing.values(), key=lambda r: r["status"] != "executed"):
+                    by_content.setdefault(content_key(r), r["id"])
+                # first the actions already stored under some id, then the rest by their own id
+                placed = [by_content.pop(content_key(r), None) for r in rows]
+                claimed = {row_id for row_id in placed if row_id}
+                for i, r in enumerate(rows):
+                    if placed[i] is None:
+                        taken = existing.get(r["id"])
+                        if r["id"] in claimed or (taken is not None and taken["status"] == "executed"):
+                            placed[i] = _fresh_id(r)
+                        else:
+                            placed[i] = r["id"]
+                        claimed.add(placed[i])
+                kept = placed
+                writes = [
+                    dict(r, id=row_id) for r, row_id in zip(rows, placed)
+                    if row_id not in existing or existing[row_id]["status"] != "executed"
+                ]
+                ids = set(kept)
+                base = self._next_version()
+                stale = [
+                    r[0] for r in self._conn.execute(
+                        "SELECT id FROM actions WHERE meeting_id = ? AND status != 'executed'", (meeting_id,)
+                    )
+                    if r[0] not in ids
+                ]
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO action_tombstones (id, version) VALUES (?, ?)",
+                    [(action_id, base + i) for i, action_id in enumerate(stale)],
+                )
+                self._conn.executemany("DELETE FROM actions WHERE id = ?", [(action_id,) for action_id in stale])
+                self._conn.executemany(
+                    "DELETE FROM action_tombstones WHERE id = ?", [(r["id"],) for r in writes]
+                )
+                base += len(stale)
+                self._conn.executemany(
+                    """INSERT INTO actions (id, meeting_id, action_id, type, kind, summary, assignee, due_date,
+                                            confidence, snippet, tags, duplicate_of, payload, created_at, updated_at,
+                                            version, event)
+                       VALUES (:id, :meeting_id, :action_id, :type, :kind, :summary, :assignee, :due_date,
+                               :confidence, :snippet, :tags, :duplicate_of, :payload, :now, :now, :version, 'created')
+                       ON CONFLICT(id) DO UPDATE SET
+                           type = excluded.type, kind = excluded.kind, summary = excluded.summary,
+                           assignee = excluded.assignee, due_date = excluded.due_date,
+                           confidence = excluded.confidence, snippet = excluded.snippet,
+                           tags = excluded.tags, duplicate_of = excluded.duplicate_of, payload = excluded.payload, updated_at = excluded.updated_at,
+                           version = excluded.version, event = 'updated',
+                           status = CASE WHEN (actions.type, actions.kind, actions.summary)
+                                              IS (excluded.type, excluded.kind, excluded.summary)
+                                         THEN actions.status ELSE 'staged' END
+                       WHERE actions.status != 'executed'""",
+                    [dict(r, now=now, version=base + i) for i, r in enumerate(writes)],
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        if writes or stale:
+            self._notify(base + len(writes) - 1)
+        return kept
+
+    def _notify(self, version):
+        for listener in self.listeners:
+            listener(version)
+
+    def _max_version(self):
+        return self._conn.execute(
+            """SELECT MAX(COALESCE((SELECT MAX(version) FROM actions), 0),
+                          COALESCE((SELECT MAX(version) FROM action_tombstones), 0))"""
+        ).fetchone()[0]
+
+    def _next_version(self):
+        # call inside BEGIN IMMEDIATE: the write lock makes versions unique across processes
+        return self._max_version() + 1
+
+    def max_version(self):
+        """Change cursor: grows on every insert, re-parse, removal or status change."""
+        with self._lock:
+            return self._max_version()
+
+    def _row(self, row, full=False):
+        item = {k: row[k] for k in COLUMNS}
+        item["tags"] = json.loads(item["tags"] or "[]")
+        item["created_at"] = _iso(item["created_at"])
+        item["updated_at"] = _iso(item["updated_at"])
+        if full:
+            item["action"] = json.loads(row["payload"])
+        return item
+
+    def get(self, action_id):
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM actions WHERE id = ?", (action_id,)).fetchone()
+        return self._row(row, full=True) if row else None
+
+    def query(self, status=None, types=None, min_confidence=None, meeting_id=None,
+              sort="created_at", order="desc", limit=100, cursor=None):
+        """Returns (items, next_cursor); next_cursor is None on the last page."""
+        if sort not in SORTS:
+            raise ValueError(f"sort must be one of {sorted(SORTS)}")
+        if order not in ("asc", "desc"):
+            raise ValueError("order must be asc or desc")
+        limit = max(1, min(int(limit), MAX_PAGE))
+        expr = SORTS[sort]
+
+        where, args = _filters(status, types, min_confidence, meeting_id)
+        if cursor:
+            value, row_id = decode_cursor(cursor)
+            where.append(f"({expr}, id) {'<' if order == 'desc' else '>'} (?, ?)")
+            args.extend([value, row_id])
+
+        sql = (
+            f"SELECT *, {expr} AS sort_value FROM actions"
+            + (f" WHERE {' AND '.join(where)}" if where else "")
+            + f" ORDER BY {expr} {order}, id {order} LIMIT ?"
+        )
+        with self._lock:
+            rows = self._conn.execute(sql, args + [limit + 1]).fetchall()
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(rows[-1]["sort_value"], rows[-1]["id"])
+        return [self._row(r) for r in rows], next_cursor
+
+    def changes(self, since, status=None, types=None, min_confidence=None, meeting_id=None, limit=MAX_PAGE):
+        """
+        Rows changed after version `since`, oldest change first. Returns
+        (items, last_version, more). A changed row that no longer matches the
+        filters, or that a re-parse removed, comes back as a tombstone
+        {"id", "version", "deleted": true}.
+        """
+        limit = max(1, min(int(limit), MAX_PAGE))
+        where, args = _filters(status, types, min_confidence, meeting_id)
+        matches = " AND ".join(where) or "1"
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT *, ({matches}) AS matches FROM actions WHERE version > ? ORDER BY version LIMIT ?",
+                args + [since, limit + 1],
+            ).fetchall()
+            removed = self._conn.execute(
+                "SELECT id, version FROM action_tombstones WHERE version > ? ORDER BY version LIMIT ?",
+                (since, limit + 1),
+            ).fetchall()
+        items = [self._row(r) if r["matches"] else {"id": r["id"], "version": r["version"], "deleted": True}
+                 for r in rows]
+        items += [{"id": r["id"], "version": r["version"], "deleted": True} for r in removed]
+        items.sort(key=lambda item: item["version"])
+        more = len(items) > limit
+        items = items[:limit]
+        return items, (items[-1]["version"] if items else since), more
+
+    def counts(self):
+        """{"total", "by_status": {...}, "by_type": {...}}, answered from the indexes."""
+        with self._lock:
+            by_status = dict(self._conn.execute("SELECT status, COUNT(*) FROM actions GROUP BY status").fetchall())
+            by_type = dict(self._conn.execute("SELECT type, COUNT(*) FROM actions GROUP BY type").fetchall())
+        return {"total": sum(by_status.values()), "by_status": by_status, "by_type": by_type}
+
+    def targets(self, ids=None, status=("staged",)):
+        """(id, type, status, duplicate_of) of the given ids, or of every action in `status` when ids is None."""
+        with self._lock:
+            if ids is None:
+                rows = self._conn.execute(
+                    f"SELECT id, type, status, duplicate_of FROM actions WHERE status IN ({','.join('?' * len(status))})", status
+                ).fetchall()
+            else:
+                rows = []
+                # stay under SQLite's bound-parameter limit
+                for i in range(0, len(ids), 500):
+                    chunk = ids[i:i + 500]
+                    rows += self._conn.execute(
+                        f"SELECT id, type, status, duplicate_of FROM actions WHERE id IN ({','.join('?' * len(chunk))})", chunk
+                    ).fetchall()
+        return [tuple(r) for r in rows]
+
+    def set_status(self, action_id, status):
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                version = self._next_version()
+                self._conn.execute(
+                    "UPDATE actions SET status = ?, updated_at = ?, version = ?, event = ? WHERE id = ?",
+                    (status, time.time(), version, status if status in EVENTS else "updated", action_id),
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        self._notify(version)
@@ -0,0 +1,208 @@
+"""
+Local source-span alignment. The model no longer reports character offsets;
+each action's `text` is looked up in the transcript itself: an exact token
+sequence match through a trigram index first, then a fuzzy fallback that
+picks the short stretch of transcript covering most of the action's
+(IDF-weighted) content words. The index is built once per transcript, so
+lookups stay fast on hour-long meetings.
+"""
+import bisect, math, os, re
+
+from chunking import TURN_RE
+from metrics import Counter
+
+
+# share of the action's weighted content words a fuzzy match must cover
+ALIGN_MIN_SCORE = float(os.getenv("ALIGN_MIN_SCORE", 0.5))
+CONTEXT_MAX_CHARS = int(os.getenv("CONTEXT_MAX_CHARS", 300))
+
+WORD_RE = re.compile(r"[a-z0-9@]+(?:'[a-z]+)?")
+SENTENCE_BREAK_RE = re.compile(r"[.!?\n]")
+STOPWORDS = frozenset(
+    "a an and the to of for on in at by with from about into is are be will we i you he she they it this that "
+    "our your their my me us please let lets can could should would i'll we'll you'll it's that's".split()
+)
+
+ALIGNMENTS = Counter("nlp_parser_span_alignments_total", "Action source spans located in the transcript.", ["result"])
+
+
+def _stem(word):
+    # just enough to match "sends"/"sending"/"sent out" style inflections against the canonical text
+    for suffix in ("ing", "ed", "es", "s"):
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+            return word[: -len(suffix)]
+    return word
+
+
+def _fold(text):
+    # same length in and out, so match offsets stay transcript offsets
+    return text.lower().replace("\u2019", "'")
+
+
+def terms(text):
+    return [_stem(m.group()) for m in WORD_RE.finditer(_fold(text or ""))]
+
+
+class SpanIndex:
+    def __init__(self, transcript):
+        self.transcript = transcript
+        self.starts, self.ends, self.terms = [], [], []
+        for m in WORD_RE.finditer(_fold(transcript)):
+            self.starts.append(m.start())
+            self.ends.append(m.end())
+            self.terms.append(_stem(m.group()))
+        self.postings = {}
+        for pos, term in enumerate(self.terms):
+            self.postings.setdefault(term, []).append(pos)
+        self.trigrams = {}
+        for pos in range(len(self.terms) - 2):
+            self.trigrams.setdefault(tuple(self.terms[pos:pos + 3]), []).append(pos)
+        n = len(self.terms) or 1
+        self.idf = {term: math.log(1 + n / len(p)) for term, p in self.postings.items()}
+
+        self.turn_starts, self.speakers = [], []
+        for m in TURN_RE.finditer(transcript):
+            self.turn_starts.append(m.start())
+            self.speakers.append(m.group("speaker").strip())
+        # header lines ([Meeting Title: ...], [Participants: ...]) before the first turn never hold an action
+        self.body_token = bisect.bisect_left(self.starts, self.turn_starts[0]) if self.turn_starts else 0
+
+    def _nearest(self, candidates, hint, taken=()):
+        # an action repeated in the transcript gets the next occurrence no other action claimed
+        free = [c for c in candidates if c[0] not in taken] or candidates
+        if hint is None:
+            return free[0]
+        return min(free, key=lambda c: abs(self.starts[c[0]] - hint))
+
+    def locate(self, text, hint=None, taken=()):
+        """
+        (start_char, end_char, kind) of the best match for `text`, kind "exact"
+        or "fuzzy"; None if nothing fits. Matches starting at a token position
+        in `taken` are used only when there is no other.
+        """
+        query = terms(text)
+        if not query:
+            return None
+
+        if len(query) >= 3:
+            exact = [
+                (pos, pos + len(query) - 1)
+                for pos in self.trigrams.get(tuple(query[:3]), ())
+                if pos >= self.body_token and self.terms[pos:pos + len(query)] == query
+            ]
+            if exact:
+                first, last = self._nearest(exact, hint, taken)
+                return self.starts[first], self.ends[last], "exact"
+
+        content = {t for t in query if t not in STOPWORDS and t in self.postings}
+        total = sum(self.idf.get(t, math.log(1 + len(self.terms) or 1)) for t in set(query) if t not in STOPWORDS)
+        if not content or not total:
+            return None
+        hits = sorted((pos, term) for term in content for pos in self.postings[term] if pos >= self.body_token)
+        width = max(8, 3 * len(query))
+
+        # a match inside one speaker turn first; across turns only when no single turn is good enough
+        for same_turn in ((True, False) if self.turn_starts else (False,)):
+            best = self._windows(hits, width, same_turn)
+            if best and best[0][0] / total >= ALIGN_MIN_SCORE:
+                first, last = self._nearest([(b[1], b[2]) for b in best], hint, taken)
+                return self.starts[first], self.ends[last], "fuzzy"
+        return None
+
+    def _turn(self, pos):
+        return bisect.bisect_right(self.turn_starts, self.starts[pos]) - 1
+
+    def _windows(self, hits, width, same_turn):
+        """
+        Sliding window over hit positions, scored by the weighted share of
+        distinct query terms inside it. Returns the best-scoring windows as
+        (score, first, last), shortest first among overlapping ties.
+        """
+        best, counts, score, lo, turn = [], {}, 0.0, 0, None
+        for hi, (pos, term) in enumerate(hits):
+            if same_turn and self._turn(pos) != turn:
+                counts, score, lo, turn = {}, 0.0, hi, self._turn(pos)
+            if counts.get(term, 0) == 0:
+                score += self.idf[term]
+            counts[term] = counts.get(term, 0) + 1
+            # drop hits that fell out of the window, then leading repeats that add nothing to the score
+            while pos - hits[lo][0] >= width or counts[hits[lo][1]] > 1:
+                old = hits[lo][1]
+                counts[old] -= 1
+                if counts[old] == 0:
+                    score -= self.idf[old]
+                lo += 1
+            first = hits[lo][0]
+            if not best or score > best[0][0] + 1e-9:
+                best = [(score, first, pos)]
+            elif abs(score - best[0][0]) <= 1e-9:
+                if first > best[-1][2]:
+                    best.append((score, first, pos))
+                elif pos - first < best[-1][2] - best[-1][1]:
+                    best[-1] = (score, first, pos)
+        return best
+
+    def speaker_at(self, pos):
+        i = bisect.bisect_right(self.turn_starts, pos) - 1
+        return self.speakers[i] if i >= 0 else None
+
+    def context(self, start, end):
+        """The sentence(s) around [start, end), kept inside the speaker turn and CONTEXT_MAX_CHARS."""
+        i = bisect.bisect_right(self.turn_starts, start) - 1
+        floor = self.turn_starts[i] if i >= 0 else 0
+        ceiling = self.turn_starts[i + 1] if i + 1 < len(self.turn_starts) else len(self.transcript)
+        left = start
+        while left > floor and not SENTENCE_BREAK_RE.match(self.transcript[left - 1]):
+            left -= 1
+        m = SENTENCE_BREAK_RE.search(self.transcript, end, ceiling)
+        right = m.end() if m else ceiling
+        snippet = self.transcript[left:right].strip()
+        # drop the "Speaker:" prefix when the sentence opens the turn
+        if i >= 0 and left == floor:
+            snippet = TURN_RE.sub("", snippet, count=1).strip()
+        if len(snippet) > CONTEXT_MAX_CHARS:
+            snippet = self.transcript[start:end].strip()[:CONTEXT_MAX_CHARS]
+        return snippet
+
+
+class Aligner:
+    """Fills one action at a time; the index is built on first use and shared by the whole request."""
+
+    def __init__(self, transcript, index=None):
+        self.transcript = transcript
+        self.index = index
+        self.taken = set()  # token positions already claimed by an action
+
+    def align(self, action):
+        if (action.get("metadata") or {}).get("source") == "rules":
+            return action
+        self.index = self.index or SpanIndex(self.transcript)
+        span = action.get("source_span") if isinstance(action.get("source_span"), dict) else {}
+        hint = span.get("start_char") if isinstance(span.get("start_char"), int) else None
+        found = self.index.locate(action.get("text"), hint, self.taken)
+        if found is None:
+            ALIGNMENTS.inc(result="miss")
+            return action
+        start, end, kind = found
+        ALIGNMENTS.inc(result=kind)
+        self.taken.add(bisect.bisect_left(self.index.starts, start))
+        span = {"start_char": start, "end_char": end}
+        speaker = self.index.speaker_at(start)
+        if speaker:
+            span["speaker"] = speaker
+        action["source_span"] = span
+        action["context"] = self.index.context(start, end)
+        return action
+
+
+def align_actions(actions, transcript, index=None):
+    """
+    Fill source_span (start_char, end_char, speaker) and context from the
+    transcript. Rule-pass actions already carry exact spans and are kept;
+    an action that cannot be located keeps whatever the model reported.
+    `index` is a SpanIndex of `transcript` already built for the request.
+    """
+    aligner = Aligner(transcript, index)
+    for action in actions:
+        aligner.align(action)
+    return actions
@@ -0,0 +1,119 @@
+"""
+Drive /parse at a fixed concurrency and report throughput and latency
+percentiles, overall and per pipeline stage (from the Server-Timing header).
+
+    python bench_parse.py --url http://localhost:8000 --concurrency 32 --requests 500 \\
+        --transcript ../transcripts/demo_transcript_1.txt --unique --no-fast-path
+
+--unique appends a nonce to each transcript so every request misses the
+result cache; leave it off to measure the cached path.
+"""
+import argparse, asyncio, json, statistics, sys, time, uuid
+
+import httpx
+
+from timing import parse_server_timing
+
+
+def percentile(values, q):
+    if not values:
+        return float("nan")
+    ordered = sorted(values)
+    k = (len(ordered) - 1) * q
+    lo, hi = int(k), min(int(k) + 1, len(ordered) - 1)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (k - lo)
+
+
+def summarize(values):
+    return {
+        "n": len(values),
+        "mean_ms": round(statistics.fmean(values) * 1000, 1) if values else None,
+        "p50_ms": round(percentile(values, 0.50) * 1000, 1),
+        "p95_ms": round(percentile(values, 0.95) * 1000, 1),
+        "p99_ms": round(percentile(values, 0.99) * 1000, 1),
+    }
+
+
+async def run(args):
+    transcripts = []
+    for path in args.transcript:
+        with open(path) as f:
+            transcripts.append(f.read())
+
+    latencies, stages, statuses = [], {}, {}
+    counter = iter(range(args.requests))
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+
+    async with httpx.AsyncClient(base_url=args.url, timeout=args.timeout, limits=limits) as client:
+        async def worker():
+            for i in counter:
+                transcript = transcripts[i % len(transcripts)]
+                if args.unique:
+                    transcript += f"\n[Bench nonce: {uuid.uuid4().hex}]\n"
+                body = {"meeting_id": f"bench-{i}", "transcript": transcript,
+                        "fast_path": not args.no_fast_path, "no_cache": args.no_cache}
+                started = time.perf_counter()
+                try:
+                    r = await client.post(args.path, json=body)
+                    status = r.status_code
+                    for name, seconds in parse_server_timing(r.headers.get("Server-Timing")).items():
+                        stages.setdefault(name, []).append(seconds)
+                except httpx.HTTPError as e:
+                    status = type(e).__name__
+                elapsed = time.perf_counter() - started
+                statuses[status] = statuses.get(status, 0) + 1
+                if status == 200:
+                    latencies.append(elapsed)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+        wall = time.perf_counter() - started
+
+    return {
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "wall_s": round(wall, 2),
+        "throughput_rps": round(args.requests / wall, 2),
+        "statuses": {str(k): v for k, v in statuses.items()},
+        "latency": summarize(latencies),
+        "stages": {name: summarize(values) for name, values in sorted(stages.items())},
+    }
+
+
+def print_report(report):
+    print(f"{report['requests']} requests @ concurrency {report['concurrency']}: "
+          f"{report['wall_s']}s wall, {report['throughput_rps']} req/s, statuses {report['statuses']}")
+    print(f"{'stage':<12}{'n':>7}{'mean':>10}{'p50':>10}{'p95':>10}{'p99':>10}   (ms)")
+    rows = [("client", report["latency"])] + list(report["stages"].items())
+    for name, s in rows:
+        print(f"{name:<12}{s['n']:>7}{s['mean_ms'] or 0:>10}{s['p50_ms']:>10}{s['p95_ms']:>10}{s['p99_ms']:>10}")
+
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    p.add_argument("--url", default="http://localhost:8000")
+    p.add_argument("--path", default="/parse")
+    p.add_argument("--concurrency", type=int, default=16)
+    p.add_argument("--requests", type=int, default=200)
+    p.add_argument("--timeout", type=float, default=180)
+    p.add_argument("--transcript", action="append", default=None,
+                   help="transcript file; repeat to rotate through several (default: demo transcript)")
+    p.add_argument("--unique", action="store_true", help="make every transcript unique (defeats the result cache)")
+    p.add_argument("--no-cache", action="store_true", help="send no_cache=true")
+    p.add_argument("--no-fast-path", action="store_true", help="send fast_path=false so every request reaches the model")
+    p.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = p.parse_args(argv)
+    args.transcript = args.transcript or ["../transcripts/demo_transcript_1.txt"]
+
+    report = asyncio.run(run(args))
+    if args.json:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    else:
+        print_report(report)
+    # non-zero exit when anything failed, so CI can gate on it
+    return 0 if set(report["statuses"]) <= {"200"} else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,178 @@
+import os, re
+from dataclasses import dataclass
+
+
+# ~4 characters per token is close enough for llama-3 on English meeting text
+CHARS_PER_TOKEN = 4
+CHUNK_TOKEN_BUDGET = int(os.getenv("CHUNK_TOKEN_BUDGET", 1500))
+CHUNK_OVERLAP_TOKENS = int(os.getenv("CHUNK_OVERLAP_TOKENS", 150))
+
+# "Alice: ..." at the start of a line opens a speaker turn
+TURN_RE = re.compile(r"^(?P<speaker>[A-Z][\w .'\-]{0,40}?):[ \t]", re.MULTILINE)
+SENTENCE_END_RE = re.compile(r"(?<=[.!?])\s+")
+
+
+def estimate_tokens(text):
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+@dataclass
+class Window:
+    index: int
+    start: int  # global char offset of text[0] in the transcript
+    end: int
+    text: str
+
+
+def split_turns(transcript):
+    """Return (start, end) char ranges, one per speaker turn; text before the first turn is its own segment."""
+    starts = [m.start() for m in TURN_RE.finditer(transcript)]
+    if not starts or starts[0] != 0:
+        starts.insert(0, 0)
+    bounds = starts + [len(transcript)]
+    return [(bounds[i], bounds[i + 1]) for i in range(len(starts)) if bounds[i] < bounds[i + 1]]
+
+
+def _split_long(start, end, transcript, budget_chars):
+    # a single turn over budget: cut at sentence ends, hard-cut as a last resort
+    pieces = []
+    cut = start
+    for m in SENTENCE_END_RE.finditer(transcript, start, end):
+        if m.end() - cut > budget_chars and m.start() > cut:
+            pieces.append((cut, m.start()))
+            cut = m.end()
+    pieces.append((cut, end))
+    out = []
+    for s, e in pieces:
+        while e - s > budget_chars:
+            out.append((s, s + budget_chars))
+            s += budget_chars
+        if e > s:
+            out.append((s, e))
+    return out
+
+
+def make_windows(transcript, budget_tokens=None, overlap_tokens=None):
+    """Pack whole speaker turns into token-budgeted windows; each window repeats the tail turns of the previous one."""
+    budget_chars = (budget_tokens or CHUNK_TOKEN_BUDGET) * CHARS_PER_TOKEN
+    overlap_chars = (CHUNK_OVERLAP_TOKENS if overlap_tokens is None else overlap_tokens) * CHARS_PER_TOKEN
+
+    segments = []
+    for s, e in split_turns(transcript):
+        if e - s > budget_chars:
+            segments.extend(_split_long(s, e, transcript, budget_chars))
+        else:
+            segments.append((s, e))
+
+    windows = []
+    i = 0
+    while i < len(segments):
+        j = i
+        while j < len(segments) and segments[j][1] - segments[i][0] <= budget_chars:
+            j += 1
+        j = max(j, i + 1)
+        start, end = segments[i][0], segments[j - 1][1]
+        windows.append(Window(len(windows), start, end, transcript[start:end]))
+        if j >= len(segments):
+            break
+        # back up over whole turns that fit in the overlap budget, but always make progress
+        k = j
+        while k - 1 > i and end - segments[k - 1][0] <= overlap_chars:
+            k -= 1
+        i = k
+    return windows
+
+
+def _words(text):
+    return set(re.findall(r"[a-z0-9@.]+", (text or "").lower()))
+
+
+def _similar(a, b, threshold=0.8):
+    if a.get("type") != b.get("type"):
+        return False
+    wa, wb = _words(a.get("text")), _words(b.get("text"))
+    if not wa or not wb:
+        return False
+    return len(wa & wb) / len(wa | wb) >= threshold
+
+
+def _span(action):
+    span = action.get("source_span") or {}
+    return span.get("start_char"), span.get("end_char")
+
+
+def _overlaps(a, b):
+    (s1, e1), (s2, e2) = _span(a), _span(b)
+    if None in (s1, e1, s2, e2):
+        return False
+    return s1 < e2 and s2 < e1
+
+
+def shift_spans(action, offset):
+    """Copy of `action` with its window-relative source_span moved to transcript offsets."""
+    action = dict(action)
+    span = action.get("source_span")
+    if isinstance(span, dict):
+        span = dict(span)
+        for k in ("start_char", "end_char"):
+            if isinstance(span.get(k), int):
+                span[k] += offset
+        action["source_span"] = span
+    return action
+
+
+def _inside(action, start, end):
+    s, e = _span(action)
+    return s is not None and e is not None and start <= s and e <= end
+
+
+def find_duplicate(earlier, action, overlap):
+    """
+    The action in `earlier` that `action` restates, or None. Only the text two
+    consecutive windows share, `overlap` = (next.start, previous.end), is
+    extracted twice, so both actions must lie inside it.
+    """
+    start, end = overlap
+    if not _inside(action, start, end):
+        return None
+    return next(
+        (m for m in earlier
+         if _inside(m, start, end) and (_similar(m, action) or (_overlaps(m, action) and _similar(m, action, 0.5)))),
+        None,
+    )
+
+
+def sort_by_span(actions):
+    actions.sort(key=lambda a: (_span(a)[0] is None, _span(a)[0] or 0))
+    return actions
+
+
+def merge_actions(window_results):
+    """
+    Merge per-window `actions` arrays: shift source_span offsets to global
+    positions and drop the copy of any action extracted twice from an overlap.
+    `window_results` is a list of (Window, actions) in transcript order; the
+    actions need window-relative spans to be matched against their copies.
+    """
+    merged = []
+    previous, previous_end = [], None  # the previous window's actions, as kept
+    for window, actions in window_results:
+        current = []
+        for action in actions or []:
+            action = shift_spans(action, window.start)
+            dup = find_duplicate(previous, action, (window.start, previous_end)) if previous_end is not None else None
+            if dup is None:
+                merged.append(action)
+            elif action.get("confidence", 0) > dup.get("confidence", 0):
+                merged[merged.index(dup)] = action
+            else:
+                action = dup
+            current.append(action)
+        previous, previous_end = current, window.end
+
+    seen = set()
+    for n, action in enumerate(merged):
+        if action.get("id") in seen or not action.get("id"):
+            action["id"] = f"{action.get('id') or 'a'}-{n + 1}"
+        seen.add(action["id"])
+    return sort_by_span(merged)
@@ -0,0 +1,275 @@
+"""
+Local due-date resolution. Deadline phrases ("by end of day", "by Monday",
+"next Wednesday at 10 a.m.", "in two weeks", "Dec 3rd") are matched by one
+compiled grammar and turned into the schema's `due_date` against an anchor:
+the request's `meeting_date`, else the transcript's `[Date: ...]` header,
+else the day the document was generated. The model does no calendar
+arithmetic, so the same transcript always gets the same dates.
+
+Month-day dates and "today"/"tonight" only count after a deadline word ("by
+Dec 3rd", "later today"), and "on Monday" not in a past-tense clause ("as Bob
+said on Monday"). A bare weekday needs a forward-looking clause ("I'll send
+the report Monday", not "the Monday standup" or "every Monday"). Mentions that
+are not deadlines leave due_date alone.
+
+Conventions: a bare or "by" weekday that counts is the next one after the anchor, "this
+Friday" may be the anchor itself, and "next Wednesday" is the Wednesday of
+the following calendar week (weeks start on Monday). "End of week" and "next
+week" mean that week's Friday; "end of month" its last day.
+"""
+import calendar, datetime, re
+
+from metrics import Counter
+
+
+DATE_HEADER_RE = re.compile(r"^[ \t]*\[Date:[ \t]*(?P<value>[^\]]*)\]", re.M | re.I)
+
+_MONTH = r"jan(?:uary)?|feb(?:ruary)?|mar(?:ch)?|apr(?:il)?|may|june?|july?|aug(?:ust)?|sep(?:t(?:ember)?)?|oct(?:ober)?|nov(?:ember)?|dec(?:ember)?"
+_WEEKDAY = r"mon(?:day)?|tue(?:s(?:day)?)?|wed(?:nesday)?|thu(?:r(?:s(?:day)?)?)?|fri(?:day)?|sat(?:urday)?|sun(?:day)?"
+_COUNT = r"\d+|an?|one|two|three|four|five|six|seven|eight|nine|ten|a\s+couple\s+of|a\s+few"
+_ORD = r"(?:st|nd|rd|th)?"
+
+# one alternative per expression kind; the outer group name is the kind
+DUE_RE = re.compile(
+    rf"""\b(?:
+        (?P<iso>(?P<iso_y>\d{{4}})-(?P<iso_m>\d{{1,2}})-(?P<iso_d>\d{{1,2}}))
+      | (?P<us>(?P<us_m>\d{{1,2}})/(?P<us_d>\d{{1,2}})/(?P<us_y>\d{{4}}))
+      | (?P<md>(?P<md_mon>{_MONTH})\.?\s+(?P<md_d>\d{{1,2}}){_ORD}\b(?:,?\s+(?P<md_y>\d{{4}}))?)
+      | (?P<dm>(?P<dm_d>\d{{1,2}}){_ORD}\s+(?:of\s+)?(?P<dm_mon>{_MONTH})\b\.?(?:,?\s+(?P<dm_y>\d{{4}}))?)
+      | (?P<end>(?:the\s+)?end\s+of\s+(?:the\s+)?(?P<end_next>next\s+)?(?P<end_unit>day|week|month|quarter|year))
+      | (?P<abbr>eod|cob|eow|eom|close\s+of\s+business)
+      | (?P<rel>(?:the\s+)?day\s+after\s+tomorrow|today|tonight|tomorrow)
+      | (?P<in>(?:in|within)\s+(?P<in_n>{_COUNT})\s+(?P<in_unit>business\s+days?|days?|weeks?|months?))
+      | (?P<nxt>(?:next|the\s+following)\s+(?P<nxt_unit>week|month))
+      | (?P<wd>(?:(?P<wd_p>by|on|before|until|till|due)\s+)?(?:(?P<wd_q>this|next|coming|the\s+following)\s+)?(?P<wd_day>{_WEEKDAY}))
+    )\b""",
+    re.I | re.X,
+)
+KINDS = ("iso", "us", "md", "dm", "end", "abbr", "rel", "in", "nxt", "wd")
+# an optional time of day right after the phrase: "at 10 a.m.", "3pm", "at 14:30", "at noon"
+TIME_RE = re.compile(
+    r"\s*,?\s*(?:at\s+|@\s*|by\s+)?(?:(?P<h>\d{1,2})(?::(?P<min>\d{2}))?\s*(?P<ampm>[ap])\.?\s*m\b\.?|(?P<h24>\d{1,2}):(?P<min24>\d{2})\b|(?P<noon>noon|midday)\b)",
+    re.I,
+)
+
+# deadline words a month-day date or "today" must follow
+CUE_BEFORE_RE = re.compile(r"\b(?:by|before|due(?:\s+(?:on|by))?|until|till|no\s+later\s+than|on|later)\s+(?:the\s+)?$", re.I)
+CLAUSE_BREAK_RE = re.compile(r"[.;:!?,\u2014]")
+FUTURE_RE = re.compile(r"\b(?:will|shall|going to|need to|have to|let['’]s|can you|could you|please)\b|['’]ll\b", re.I)
+# words that make a bare weekday a recurring or past day, not a deadline
+NOT_DUE_BEFORE_RE = re.compile(r"\b(?:the|every|each|last|past|a)\s+$", re.I)
+PAST_RE = re.compile(
+    r"\b(?:said|told|mentioned|discussed|talked|asked|met|was|were|did|had|happened|agreed|decided|sent|shipped)\b", re.I
+)
+
+COUNTS = {"a": 1, "an": 1, "one": 1, "two": 2, "three": 3, "four": 4, "five": 5, "six": 6, "seven": 7,
+          "eight": 8, "nine": 9, "ten": 10, "a couple of": 2, "a few": 3}
+MONTHS = {m: i for i, m in enumerate("jan feb mar apr may jun jul aug sep oct nov dec".split(), 1)}
+WEEKDAYS = {d: i for i, d in enumerate("mon tue wed thu fri sat sun".split())}
+FRIDAY = 4
+
+DUE_DATES = Counter("nlp_parser_due_dates_total", "Action due dates resolved from deadline phrases.", ["result"])
+
+
+def _add_months(day, months):
+    month = day.month - 1 + months
+    year, month = day.year + month // 12, month % 12 + 1
+    return day.replace(year=year, month=month, day=min(day.day, calendar.monthrange(year, month)[1]))
+
+
+def _month_end(day):
+    return day.replace(day=calendar.monthrange(day.year, day.month)[1])
+
+
+def _week_friday(day, weeks=0):
+    monday = day - datetime.timedelta(days=day.weekday())
+    return monday + datetime.timedelta(days=7 * weeks + FRIDAY)
+
+
+def _calendar_date(year, month, day, anchor):
+    # a month and day without a year is the next one on or after the anchor
+    try:
+        if year:
+            return datetime.date(int(year), month, int(day))
+        found = datetime.date(anchor.year, month, int(day))
+        return found if found >= anchor else found.replace(year=anchor.year + 1)
+    except ValueError:
+        return None
+
+
+def _resolve(m, anchor):
+    """The date a DUE_RE match means relative to `anchor` (a datetime.date); None when it is not a deadline."""
+    kind = next(k for k in KINDS if m.group(k))
+    g = lambda name: (m.group(name) or "").lower()
+
+    if kind in ("iso", "us"):
+        try:
+            return datetime.date(int(m.group(f"{kind}_y")), int(m.group(f"{kind}_m")), int(m.group(f"{kind}_d")))
+        except ValueError:
+            return None
+    if kind in ("md", "dm"):
+        if anchor is None and not m.group(f"{kind}_y"):
+            return None
+        return _calendar_date(m.group(f"{kind}_y"), MONTHS[g(f"{kind}_mon")[:3]], m.group(f"{kind}_d"), anchor)
+    if anchor is None:
+        return None
+
+    if kind == "abbr":
+        unit = {"eow": "week", "eom": "month"}.get(g("abbr"), "day")
+        return _resolve_end(unit, 0, anchor)
+    if kind == "end":
+        return _resolve_end(g("end_unit"), 1 if m.group("end_next") else 0, anchor)
+    if kind == "rel":
+        phrase = g("rel")
+        days = 2 if "after" in phrase else 1 if phrase == "tomorrow" else 0
+        return anchor + datetime.timedelta(days=days)
+    if kind == "in":
+        n = int(g("in_n")) if g("in_n").isdigit() else COUNTS[re.sub(r"\s+", " ", g("in_n"))]
+        unit = g("in_unit")
+        if unit.startswith("business"):
+            day = anchor
+            while n > 0:
+                day += datetime.timedelta(days=1)
+                n -= day.weekday() < 5
+            return day
+        if unit.startswith("month"):
+            return _add_months(anchor, n)
+        return anchor + datetime.timedelta(days=n * (7 if unit.startswith("week") else 1))
+    if kind == "nxt":
+        return _resolve_end(g("nxt_unit"), 1, anchor)
+
+    target = WEEKDAYS[g("wd_day")[:3]]
+    qualifier = re.sub(r"\s+", " ", g("wd_q"))
+    if qualifier == "next":
+        monday = anchor + datetime.timedelta(days=7 - anchor.weekday())
+        return monday + datetime.timedelta(days=target)
+    ahead = (target - anchor.weekday()) % 7
+    if ahead == 0 and qualifier != "this":
+        ahead = 7
+    return anchor + datetime.timedelta(days=ahead)
+
+
+def _resolve_end(unit, step, anchor):
+    if unit == "day":
+        return anchor + datetime.timedelta(days=step)
+    if unit == "week":
+        friday = _week_friday(anchor, step)
+        # at the weekend, "end of the week" is the coming Friday
+        return friday if friday >= anchor else friday + datetime.timedelta(days=7)
+    if unit == "month":
+        return _month_end(_add_months(anchor.replace(day=1), step))
+    if unit == "quarter":
+        last_month = (anchor.month - 1) // 3 * 3 + 3
+        return _month_end(_add_months(anchor.replace(day=1, month=last_month), 3 * step))
+    return datetime.date(anchor.year + step, 12, 31)
+
+
+def _time_after(text, pos):
+    t = TIME_RE.match(text, pos)
+    if not t:
+        return None
+    if t.group("noon"):
+        return "12:00"
+    if t.group("h24"):
+        hour, minute = int(t.group("h24")), int(t.group("min24"))
+    else:
+        hour, minute = int(t.group("h")) % 12, int(t.group("min") or 0)
+        hour += 12 if t.group("ampm").lower() == "p" else 0
+    if hour > 23 or minute > 59:
+        return None
+    return f"{hour:02d}:{minute:02d}"
+
+
+def parse_anchor(value):
+    """A datetime.date from an ISO date/datetime or a written date ("Nov 21, 2025"); None if there is none."""
+    value = (value or "").strip()
+    if not value:
+        return None
+    try:
+        return datetime.date.fromisoformat(value[:10])
+    except ValueError:
+        pass
+    for m in DUE_RE.finditer(value):
+        kind = next(k for k in KINDS if m.group(k))
+        if kind in ("iso", "us") or (kind in ("md", "dm") and m.group(f"{kind}_y")):
+            return _resolve(m, None)
+    return None
+
+
+def meeting_anchor(transcript, meeting_date=None, fallback=None):
+    """The anchor date: the request's `meeting_date`, the `[Date: ...]` header, then `fallback`."""
+    anchor = parse_anchor(meeting_date)
+    if anchor is None:
+        m = DATE_HEADER_RE.search(transcript or "")
+        anchor = parse_anchor(m.group("value")) if m else None
+    return anchor or parse_anchor(fallback)
+
+
+def _is_deadline(text, m):
+    """Whether the match reads as a deadline where it stands, not a passing mention ("I may 5 times", "discussed today")."""
+    kind = next(k for k in KINDS if m.group(k))
+    if kind in ("md", "dm") or (kind == "rel" and m.group("rel").lower() in ("today", "tonight")):
+        return bool(CUE_BEFORE_RE.search(text, max(0, m.start() - 40), m.start()))
+    if kind != "wd":
+        return True
+    clause = CLAUSE_BREAK_RE.split(text[:m.start()])[-1]
+    if not (m.group("wd_p") or m.group("wd_q")):
+        # bare weekday: spelled out, in a clause that looks ahead
+        if len(m.group("wd_day")) < 6 or NOT_DUE_BEFORE_RE.search(text, max(0, m.start() - 12), m.start()):
+            return False
+        return bool(FUTURE_RE.search(clause)) and not PAST_RE.search(clause)
+    if (m.group("wd_p") or "").lower() == "on":
+        return bool(FUTURE_RE.search(clause)) or not PAST_RE.search(clause)
+    return True
+
+
+def find_due(text, anchor, memo=None):
+    """(date, time or None, phrase) for the first deadline phrase in `text`, or None."""
+    for m in DUE_RE.finditer(text or ""):
+        if not _is_deadline(text, m):
+            continue
+        phrase = m.group(0)
+        key = phrase.lower()
+        if memo is not None and key in memo:
+            due = memo[key]
+        else:
+            due = _resolve(m, anchor)
+            if memo is not None:
+                memo[key] = due
+        if due is not None:
+            return due, _time_after(text, m.end()), phrase
+    return None
+
+
+class DueDates:
+    """One anchor and one phrase memo, shared by every action of a request."""
+
+    def __init__(self, transcript, meeting_date=None, fallback=None):
+        self.anchor = meeting_anchor(transcript, meeting_date, fallback)
+        self.memo = {}
+
+    def resolve(self, action):
+        found = find_due(action.get("text"), self.anchor, self.memo) or find_due(action.get("context"), self.anchor, self.memo)
+        if found is None:
+            DUE_DATES.inc(result="kept" if action.get("due_date") else "none")
+            return action
+        due, at, phrase = found
+        DUE_DATES.inc(result="resolved")
+        action["due_date"] = due.isoformat()
+        metadata = action.setdefault("metadata", {})
+        metadata["due_phrase"] = phrase
+        if at:
+            metadata["due_time"] = at
+        return action
+
+
+def resolve_due_dates(actions, transcript, meeting_date=None, fallback=None):
+    """
+    Set due_date on every action whose text (or, failing that, its context)
+    carries a deadline phrase, overriding what the model reported. The phrase
+    goes to metadata.due_phrase and a time of day to metadata.due_time.
+    """
+    dates = DueDates(transcript, meeting_date, fallback)
+    for action in actions:
+        dates.resolve(action)
+    return actions
@@ -0,0 +1,132 @@
+"""
+Cross-meeting near-duplicate detection. Each action gets a MinHash signature
+over its text, assignees and tags; LSH band buckets live in the action
+store's SQLite file, so a new action is compared only with the few stored
+actions sharing a bucket, never with the whole store. A match above
+DEDUPE_THRESHOLD sets metadata.duplicate_of to the earlier action's store id.
+"""
+import array, hashlib, os, random, re, sqlite3, threading
+
+
+DEDUPE_ENABLED = os.getenv("DEDUPE_ENABLED", "1") == "1"
+# estimated Jaccard similarity at which two actions count as the same commitment
+DEDUPE_THRESHOLD = float(os.getenv("DEDUPE_THRESHOLD", 0.7))
+# statuses a new action is matched against; executed ones too, since re-executing them is the costly case
+DEDUPE_STATUSES = tuple(s for s in os.getenv("DEDUPE_STATUSES", "staged,executed").split(",") if s)
+
+# 16 bands x 4 rows: ~99% chance to surface a pair at J=0.7, ~2.5% at J=0.2
+BANDS, ROWS = 16, 4
+PERMUTATIONS = BANDS * ROWS
+_PRIME = (1 << 61) - 1
+_rng = random.Random(0x5EED)  # fixed seed: signatures must stay comparable across processes and restarts
+_PERMS = [(_rng.randrange(1, _PRIME), _rng.randrange(0, _PRIME)) for _ in range(PERMUTATIONS)]
+
+STOPWORDS = frozenset(
+    "a an and the to of for on in at by with from about into is are be will we i you he she they it this that "
+    "our your their please let lets can could should would need needs".split()
+)
+
+
+def _hash64(value):
+    return int.from_bytes(hashlib.blake2b(value.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+def shingles(action):
+    """Word unigrams and bigrams of the text (stopwords dropped), plus assignee and tag markers."""
+    words = [w for w in re.findall(r"[a-z0-9]+", (action.get("text") or "").lower()) if w not in STOPWORDS]
+    out = set(words)
+    out.update(f"{a} {b}" for a, b in zip(words, words[1:]))
+    for person in action.get("assignees") or []:
+        if person.get("name"):
+            out.add("@" + person["name"].strip().lower())
+    for tag in action.get("tags") or []:
+        out.add("#" + tag.strip().lower())
+    return out
+
+
+def signature(action):
+    hashes = [_hash64(s) for s in shingles(action)]
+    if not hashes:
+        return None
+    return [min((a * h + b) % _PRIME for h in hashes) for a, b in _PERMS]
+
+
+def buckets(sig):
+    # one key per band; the band number is hashed in so a single indexed column covers every band
+    return [
+        _hash64(f"{band}:" + ",".join(map(str, sig[band * ROWS:(band + 1) * ROWS]))) - (1 << 63)
+        for band in range(BANDS)
+    ]
+
+
+def similarity(sig, other):
+    return sum(x == y for x, y in zip(sig, other)) / PERMUTATIONS
+
+
+class DuplicateIndex:
+    """MinHash signatures and LSH buckets, in the action store's SQLite file."""
+
+    def __init__(self, path):
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=10, isolation_level=None)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS dedupe_signatures (action_id TEXT PRIMARY KEY, signature BLOB NOT NULL)"
+            )
+            self._conn.execute("CREATE TABLE IF NOT EXISTS dedupe_buckets (bucket INTEGER NOT NULL, action_id TEXT NOT NULL)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS dedupe_buckets_bucket ON dedupe_buckets(bucket)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS dedupe_buckets_action ON dedupe_buckets(action_id)")
+
+    def _match(self, meeting_id, sig, keys):
+        # candidates: share a bucket, still open, and from another meeting (a re-parse is not a duplicate).
+        # CROSS JOIN pins the bucket index as the driving table; left alone, SQLite scans by status
+        rows = self._conn.execute(
+            f"""SELECT DISTINCT s.action_id, s.signature FROM dedupe_buckets b
+                CROSS JOIN dedupe_signatures s ON s.action_id = b.action_id
+                CROSS JOIN actions a ON a.id = b.action_id
+                WHERE b.bucket IN ({','.join('?' * len(keys))})
+                  AND a.status IN ({','.join('?' * len(DEDUPE_STATUSES))}) AND a.meeting_id != ?""",
+            keys + list(DEDUPE_STATUSES) + [meeting_id],
+        ).fetchall()
+        best = None
+        for action_id, blob in rows:
+            score = similarity(sig, array.array("Q", blob))
+            if score >= DEDUPE_THRESHOLD and (best is None or score > best[1]):
+                best = (action_id, score)
+        return best
+
+    def mark(self, doc):
+        """
+        Set metadata.duplicate_of (and duplicate_score) on actions of `doc`
+        that restate an open action from another meeting; index the rest so
+        later meetings match against the original, never a copy.
+        """
+        meeting_id = doc["meeting_id"]
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                for action in doc.get("actions", []):
+                    action_id = f"{meeting_id}:{action['id']}"
+                    self._conn.execute("DELETE FROM dedupe_buckets WHERE action_id = ?", (action_id,))
+                    self._conn.execute("DELETE FROM dedupe_signatures WHERE action_id = ?", (action_id,))
+                    sig = signature(action)
+                    if sig is None:
+                        continue
+                    keys = buckets(sig)
+                    match = self._match(meeting_id, sig, keys)
+                    if match:
+                        metadata = action.setdefault("metadata", {})
+                        metadata["duplicate_of"], metadata["duplicate_score"] = match[0], round(match[1], 3)
+                        continue
+                    self._conn.execute(
+                        "INSERT INTO dedupe_signatures (action_id, signature) VALUES (?, ?)",
+                        (action_id, array.array("Q", sig).tobytes()),
+                    )
+                    self._conn.executemany(
+                        "INSERT INTO dedupe_buckets (bucket, action_id) VALUES (?, ?)", [(k, action_id) for k in keys]
+                    )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
@@ -0,0 +1,332 @@
+"""
+Server-side execution of approved actions. A job is a persisted set of
+(job, action) items drained by a bounded pool of asyncio workers; each
+connector (email/jira/calendar) has its own rate limit, retries and breaker.
+"""
+import asyncio, json, logging, os, sqlite3, threading, time, uuid
+
+from metrics import Counter
+from resilience import from_env as resilient_from_env
+from watsonx_client import get_client
+
+
+logger = logging.getLogger(__name__)
+
+EXECUTION_WORKERS = int(os.getenv("EXECUTION_WORKERS", 8))
+EXECUTE_TIMEOUT = float(os.getenv("EXECUTE_TIMEOUT", 30))
+# a "running" item older than this belonged to a worker that died or errored; the sweep queues it again
+EXECUTION_LEASE_S = float(os.getenv("EXECUTION_LEASE_S", 300))
+EXECUTION_SWEEP_S = float(os.getenv("EXECUTION_SWEEP_S", 60))
+# actions per second, per connector
+DEFAULT_RATES = {"email": 5, "jira": 2, "calendar": 2, "other": 10}
+RATE_LIMITS = {c: float(os.getenv(f"EXECUTE_{c.upper()}_RATE", r)) for c, r in DEFAULT_RATES.items()}
+
+# job item states; the action row itself only ever becomes executed or failed
+ACTIVE = ("queued", "running")
+
+EXECUTIONS = Counter("nlp_parser_executions_total", "Executed actions by connector and result.", ["connector", "result"])
+
+
+class RateLimiter:
+    """Token bucket; waiters are served in arrival order."""
+
+    def __init__(self, rate, burst=None):
+        self.rate = rate
+        self.capacity = burst or max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+async def run_connector(connector, action, timeout, idempotency_key):
+    """
+    POST the action to EXECUTE_<CONNECTOR>_URL; without one configured the
+    execution is a recorded dry run. `idempotency_key` goes out as the
+    Idempotency-Key header, so the connector can drop a retried delivery.
+    """
+    url = os.getenv(f"EXECUTE_{connector.upper()}_URL")
+    if not url:
+        return {"dry_run": True}
+    r = await get_client().post(url, json=action, timeout=timeout, headers={"Idempotency-Key": idempotency_key})
+    r.raise_for_status()
+    return r.json() if r.content else {}
+
+
+class JobStore:
+    """Jobs and their per-action items, in the action store's SQLite file."""
+
+    def __init__(self, path):
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=10, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    idempotency_key TEXT UNIQUE,
+                    total INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    finished_at REAL
+                )"""
+            )
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS job_items (
+                    job_id TEXT NOT NULL,
+                    action_id TEXT NOT NULL,
+                    connector TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    result TEXT,
+                    error TEXT,
+                    updated_at REAL NOT NULL,
+                    PRIMARY KEY (job_id, action_id)
+                )"""
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS job_items_status ON job_items(status, updated_at)")
+
+    def create(self, targets, idempotency_key=None, allow_duplicates=False):
+        """
+        targets: (action id, connector, action status or None when unknown, duplicate_of).
+        Actions flagged as restating another meeting's action are skipped unless
+        `allow_duplicates`. Returns (job_id, created); a repeated idempotency
+        key returns the original job.
+        """
+        now = time.time()
+        job_id = uuid.uuid4().hex
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                if idempotency_key:
+                    row = self._conn.execute(
+                        "SELECT id FROM jobs WHERE idempotency_key = ?", (idempotency_key,)
+                    ).fetchone()
+                    if row:
+                        self._conn.execute("COMMIT")
+                        return row[0], False
+                # an action already queued or running in another job is not executed twice
+                busy = {r[0] for r in self._conn.execute(
+                    "SELECT action_id FROM job_items WHERE status IN ('queued', 'running')"
+                )}
+                items = []
+                for action_id, connector, status, duplicate_of in targets:
+                    if status is None:
+                        state, error = "skipped", "action not found"
+                    elif status == "executed":
+                        state, error = "skipped", "already executed"
+                    elif duplicate_of and not allow_duplicates:
+                        state, error = "skipped", f"duplicate of {duplicate_of}"
+                    elif action_id in busy:
+                        state, error = "skipped", "already queued"
+                    else:
+                        state, error = "queued", None
+                        busy.add(action_id)
+                    items.append((job_id, action_id, connector or "other", state, error, now))
+                self._conn.execute(
+                    "INSERT INTO jobs (id, idempotency_key, total, created_at, finished_at) VALUES (?, ?, ?, ?, ?)",
+                    (job_id, idempotency_key, len(items), now,
+                     None if any(i[3] == "queued" for i in items) else now),
+                )
+                self._conn.executemany(
+                    "INSERT INTO job_items (job_id, action_id, connector, status, error, updated_at) VALUES (?, ?, ?, ?, ?, ?)",
+                    items,
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return job_id, True
+
+    def reclaim(self):
+        """
+        (job_id, action_id, connector) of items no worker is on: `running` past
+        the lease, or `queued` that long without being claimed. They are reset
+        to queued with a fresh timestamp, so each sweep hands them out once.
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                rows = self._conn.execute(
+                    """SELECT job_id, action_id, connector FROM job_items
+                       WHERE status IN ('queued', 'running') AND updated_at < ?""",
+                    (now - EXECUTION_LEASE_S,),
+                ).fetchall()
+                self._conn.executemany(
+                    "UPDATE job_items SET status = 'queued', updated_at = ? WHERE job_id = ? AND action_id = ?",
+                    [(now, r[0], r[1]) for r in rows],
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return [tuple(r) for r in rows]
+
+    def queued(self, job_id=None):
+        """(job_id, action_id, connector) still to run."""
+        with self._lock:
+            sql = "SELECT job_id, action_id, connector FROM job_items WHERE status = 'queued'"
+            args = ()
+            if job_id:
+                sql += " AND job_id = ?"
+                args = (job_id,)
+            return [tuple(r) for r in self._conn.execute(sql, args)]
+
+    def claim(self, job_id, action_id):
+        # conditional update: exactly one worker (in any process) wins the item
+        with self._lock:
+            return self._conn.execute(
+                """UPDATE job_items SET status = 'running', attempts = attempts + 1, updated_at = ?
+                   WHERE job_id = ? AND action_id = ? AND status = 'queued'""",
+                (time.time(), job_id, action_id),
+            ).rowcount == 1
+
+    def finish(self, job_id, action_id, status, result=None, error=None):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "UPDATE job_items SET status = ?, result = ?, error = ?, updated_at = ? WHERE job_id = ? AND action_id = ?",
+                (status, json.dumps(result) if result is not None else None, error, now, job_id, action_id),
+            )
+            self._conn.execute(
+                """UPDATE jobs SET finished_at = ? WHERE id = ? AND finished_at IS NULL AND NOT EXISTS (
+                       SELECT 1 FROM job_items WHERE job_id = ? AND status IN ('queued', 'running'))""",
+                (now, job_id, job_id),
+            )
+
+    def get(self, job_id, items=False):
+        with self._lock:
+            job = self._conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            if job is None:
+                return None
+            counts = dict(self._conn.execute(
+                "SELECT status, COUNT(*) FROM job_items WHERE job_id = ? GROUP BY status", (job_id,)
+            ).fetchall())
+            rows = self._conn.execute(
+                "SELECT action_id, connector, status, attempts, result, error FROM job_items WHERE job_id = ?", (job_id,)
+            ).fetchall() if items else []
+
+        finished = job["total"] - sum(counts.get(s, 0) for s in ACTIVE)
+        out = {
+            "job_id": job_id,
+            "status": "completed" if job["finished_at"] else ("running" if counts.get("running") or finished else "queued"),
+            "total": job["total"],
+            "counts": {s: counts.get(s, 0) for s in ("queued", "running", "succeeded", "failed", "skipped")},
+            "progress": round(finished / job["total"], 4) if job["total"] else 1.0,
+            "created_at": job["created_at"],
+            "finished_at": job["finished_at"],
+        }
+        if items:
+            out["items"] = [
+                {**dict(r), "result": json.loads(r["result"]) if r["result"] else None} for r in rows
+            ]
+        return out
+
+
+class ExecutionEngine:
+    def __init__(self, actions, jobs, workers=EXECUTION_WORKERS):
+        self.actions = actions
+        self.jobs = jobs
+        self.workers = workers
+        self.queue = None
+        self._tasks = []
+        self.limiters = {c: RateLimiter(rate) for c, rate in RATE_LIMITS.items()}
+        # retries / breaker per connector: EXECUTE_EMAIL_MAX_ATTEMPTS, EXECUTE_JIRA_BREAKER_FAILURES, ...
+        # a send that timed out waiting for the answer may have gone through: not retried unless EXECUTE_<C>_RETRY_TIMEOUTS=1
+        self.callers = {
+            c: resilient_from_env(f"execute_{c}", f"EXECUTE_{c.upper()}", EXECUTE_TIMEOUT, retry_timeouts=False)
+            for c in RATE_LIMITS
+        }
+
+    def start(self):
+        """Spawn the worker pool (idempotent) and re-queue work left over from a previous run."""
+        if self._tasks:
+            return
+        self.queue = asyncio.Queue()
+        self._tasks = [asyncio.ensure_future(self._worker()) for _ in range(self.workers)]
+        self._tasks.append(asyncio.ensure_future(self._resume()))
+        self._tasks.append(asyncio.ensure_future(self._sweep()))
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _resume(self):
+        await asyncio.to_thread(self.jobs.reclaim)
+        for item in await asyncio.to_thread(self.jobs.queued):
+            self.queue.put_nowait(item)
+
+    async def _sweep(self):
+        # items of any job whose worker errored out or died, in this process or another
+        while True:
+            await asyncio.sleep(EXECUTION_SWEEP_S)
+            try:
+                for item in await asyncio.to_thread(self.jobs.reclaim):
+                    self.queue.put_nowait(item)
+            except Exception:
+                logger.exception("execution lease sweep failed")
+
+    async def submit(self, ids=None, idempotency_key=None, allow_duplicates=False):
+        """Queue a job for `ids` (or every staged action); returns (job, created)."""
+        self.start()
+        if ids is None:
+            targets = await asyncio.to_thread(self.actions.targets)
+        else:
+            ids = list(dict.fromkeys(ids))
+            found = {row[0]: row for row in await asyncio.to_thread(self.actions.targets, ids)}
+            targets = [found.get(i, (i, None, None, None)) for i in ids]
+        job_id, created = await asyncio.to_thread(self.jobs.create, targets, idempotency_key, allow_duplicates)
+        if created:
+            for item in await asyncio.to_thread(self.jobs.queued, job_id):
+                self.queue.put_nowait(item)
+        return await asyncio.to_thread(self.jobs.get, job_id), created
+
+    async def _worker(self):
+        while True:
+            job_id, action_id, connector = await self.queue.get()
+            try:
+                await self._execute(job_id, action_id, connector)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                # bookkeeping failure (e.g. database locked); the lease sweep queues the item again
+                EXECUTIONS.inc(connector=connector, result="error")
+                logger.exception("execution worker error on %s/%s", job_id, action_id)
+            finally:
+                self.queue.task_done()
+
+    async def _execute(self, job_id, action_id, connector):
+        if not await asyncio.to_thread(self.jobs.claim, job_id, action_id):
+            return
+        connector = connector if connector in self.limiters else "other"
+        row = await asyncio.to_thread(self.actions.get, action_id)
+        if row is None:
+            await asyncio.to_thread(self.jobs.finish, job_id, action_id, "skipped", error="action not found")
+            return
+
+        await self.limiters[connector].acquire()
+        payload = {**row["action"], "meeting_id": row["meeting_id"], "action_ref": action_id}
+        key = f"{job_id}:{action_id}"
+        try:
+            result = await self.callers[connector].call(lambda timeout: run_connector(connector, payload, timeout, key))
+        except Exception as e:
+            EXECUTIONS.inc(connector=connector, result="failed")
+            await asyncio.to_thread(self.actions.set_status, action_id, "failed")
+            await asyncio.to_thread(self.jobs.finish, job_id, action_id, "failed", error=str(e) or type(e).__name__)
+            return
+        EXECUTIONS.inc(connector=connector, result="succeeded")
+        await asyncio.to_thread(self.actions.set_status, action_id, "executed")
+        await asyncio.to_thread(self.jobs.finish, job_id, action_id, "succeeded", result=result)
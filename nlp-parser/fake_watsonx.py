@@ -0,0 +1,155 @@
+"""
+Local stand-in for IBM Cloud IAM and the watsonx.ai chat endpoints, for load
+tests that must not burn real quota.
+
+    uvicorn fake_watsonx:app --port 9000
+    IAM_URL=http://localhost:9000/identity/token WATSONX_ENDPOINT=http://localhost:9000 \\
+        WATSONX_APIKEY=fake uvicorn main:app --port 8000
+
+Behaviour is set with env vars at startup or POST /_config at runtime:
+    FAKE_LATENCY      fixed:<ms> | uniform:<lo_ms>:<hi_ms> | lognormal:<median_ms>:<sigma>
+    FAKE_ERROR_RATE   fraction of chat calls answered with an error (default 0)
+    FAKE_ERROR_CODES  comma-separated statuses to pick from (default 429,503)
+    FAKE_COMPLETIONS  optional JSON/JSONL file of canned assistant contents;
+                      without it the completion is built from the prompt's transcript
+    FAKE_TOKEN_TTL    expires_in for issued IAM tokens (default 3600)
+"""
+import asyncio, itertools, json, math, os, random, time
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+from rules import extract as extract_rules
+
+
+app = FastAPI()
+
+config = {
+    "latency": os.getenv("FAKE_LATENCY", "lognormal:800:0.5"),
+    "error_rate": float(os.getenv("FAKE_ERROR_RATE", 0)),
+    "error_codes": [int(c) for c in os.getenv("FAKE_ERROR_CODES", "429,503").split(",")],
+    "token_ttl": int(os.getenv("FAKE_TOKEN_TTL", 3600)),
+    "stream_chunk_chars": 16,
+}
+stats = {"iam": 0, "chat": 0, "chat_stream": 0, "errors": 0}
+
+_tokens = itertools.count(1)
+
+
+def _load_completions(path):
+    if not path:
+        return []
+    with open(path) as f:
+        text = f.read()
+    try:
+        data = json.loads(text)
+        return data if isinstance(data, list) else [data]
+    except ValueError:
+        return [json.loads(line) for line in text.splitlines() if line.strip()]
+
+
+_canned = _load_completions(os.getenv("FAKE_COMPLETIONS"))
+
+
+def sample_latency():
+    kind, _, args = config["latency"].partition(":")
+    nums = [float(a) for a in args.split(":") if a]
+    if kind == "fixed":
+        ms = nums[0]
+    elif kind == "uniform":
+        ms = random.uniform(nums[0], nums[1])
+    else:  # lognormal: median, sigma
+        ms = nums[0] * math.exp(random.gauss(0, nums[1]))
+    return ms / 1000
+
+
+def _completion_for(prompt):
+    if _canned:
+        item = random.choice(_canned)
+        return item if isinstance(item, str) else json.dumps(item)
+    # echo a plausible answer: run the rule extractor over the prompt's transcript block
+    transcript = prompt.rsplit('Transcript:\n"""', 1)[-1].rsplit('"""', 1)[0]
+    actions = extract_rules(transcript).actions
+    for action in actions:
+        action["id"] = action["id"].replace("r", "a", 1)
+        action["metadata"]["source"] = "fake_watsonx"
+    return "```json\n" + json.dumps({"actions": actions}) + "\n```"
+
+
+def _maybe_error():
+    if random.random() < config["error_rate"]:
+        stats["errors"] += 1
+        status = random.choice(config["error_codes"])
+        headers = {"Retry-After": "1"} if status == 429 else {}
+        return JSONResponse({"errors": [{"code": "fake_error", "message": "injected"}]}, status_code=status, headers=headers)
+    return None
+
+
+def _usage(prompt, content):
+    return {"prompt_tokens": len(prompt) // 4, "completion_tokens": len(content) // 4,
+            "total_tokens": (len(prompt) + len(content)) // 4}
+
+
+@app.post("/identity/token")
+async def iam_token():
+    stats["iam"] += 1
+    await asyncio.sleep(0.05)
+    now = int(time.time())
+    return {"access_token": f"fake-token-{next(_tokens)}", "token_type": "Bearer",
+            "expires_in": config["token_ttl"], "expiration": now + config["token_ttl"]}
+
+
+@app.post("/ml/v1/text/chat")
+async def chat(request: Request):
+    stats["chat"] += 1
+    body = await request.json()
+    await asyncio.sleep(sample_latency())
+    error = _maybe_error()
+    if error is not None:
+        return error
+    prompt = body["messages"][-1]["content"]
+    content = _completion_for(prompt)
+    return {
+        "id": f"chat-{stats['chat']}",
+        "model_id": body.get("model_id"),
+        "created": int(time.time()),
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+        "usage": _usage(prompt, content),
+    }
+
+
+@app.post("/ml/v1/text/chat_stream")
+async def chat_stream(request: Request):
+    stats["chat_stream"] += 1
+    body = await request.json()
+    total = sample_latency()
+    # time to first token is a fraction of the total; the rest is spread over the chunks
+    await asyncio.sleep(total * 0.2)
+    error = _maybe_error()
+    if error is not None:
+        return error
+    prompt = body["messages"][-1]["content"]
+    content = _completion_for(prompt)
+    size = config["stream_chunk_chars"]
+    chunks = [content[i:i + size] for i in range(0, len(content), size)] or [""]
+
+    async def events():
+        for n, chunk in enumerate(chunks):
+            await asyncio.sleep(total * 0.8 / len(chunks))
+            event = {"choices": [{"index": 0, "delta": {"content": chunk}}]}
+            if n == len(chunks) - 1:
+                event["usage"] = _usage(prompt, content)
+            yield f"id: {n + 1}\nevent: message\ndata: {json.dumps(event)}\n\n"
+
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+
+@app.get("/_stats")
+async def get_stats():
+    return {**stats, "config": config}
+
+
+@app.post("/_config")
+async def set_config(update: dict):
+    config.update({k: v for k, v in update.items() if k in config})
+    return config
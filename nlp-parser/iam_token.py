@@ -0,0 +1,179 @@
+import asyncio, hashlib, json, logging, os, tempfile, time
+
+try:
+    import fcntl  # cross-process file lock; not available on Windows
+except ImportError:
+    fcntl = None
+
+from watsonx_client import fetch_iam_token
+from metrics import ERRORS, IAM_REFRESHES
+from timing import stage
+
+
+logger = logging.getLogger(__name__)
+
+# refresh once this fraction of the token lifetime has elapsed
+REFRESH_FRACTION = float(os.getenv("IAM_REFRESH_FRACTION", 0.8))
+# never hand out a token this close to expiry
+EXPIRY_SKEW = 30
+
+
+class SharedTokenStore:
+    """Token JSON in a local file so every worker process on the host reuses one token."""
+
+    def __init__(self, path):
+        self.path = path
+        self.lock_path = path + ".lock"
+
+    def read(self):
+        try:
+            with open(self.path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def write(self, token):
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(self.path) or ".")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(token, f)
+            os.chmod(tmp, 0o600)
+            os.replace(tmp, self.path)
+        except OSError:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+
+    def acquire(self):
+        # blocking; call from a thread
+        if fcntl is None:
+            return None
+        fd = os.open(self.lock_path, os.O_CREAT | os.O_RDWR, 0o600)
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        return fd
+
+    def release(self, fd):
+        if fd is None:
+            return
+        fcntl.flock(fd, fcntl.LOCK_UN)
+        os.close(fd)
+
+
+def default_store_path(api_key):
+    path = os.getenv("IAM_TOKEN_CACHE")
+    if path:
+        return path
+    digest = hashlib.sha256(api_key.encode()).hexdigest()[:16]
+    return os.path.join(tempfile.gettempdir(), f"nlp-parser-iam-{digest}.json")
+
+
+class IAMTokenManager:
+    """
+    Keeps a valid IAM token on hand.
+
+    - lifetime comes from `expires_in` in the IAM response
+    - a background task refreshes at REFRESH_FRACTION of the lifetime
+    - concurrent callers share one in-flight refresh (single-flight)
+    - workers share the token through SharedTokenStore, guarded by a file lock
+    """
+
+    def __init__(self, api_key, store=None):
+        self.api_key = api_key
+        self.store = store or SharedTokenStore(default_store_path(api_key))
+        self._token = None
+        self._inflight = None
+        self._bg_task = None
+
+    def _usable(self, token, now):
+        return token is not None and now < token["expiry"] - EXPIRY_SKEW
+
+    def _fresh(self, token, now):
+        return token is not None and now < token["refresh_at"]
+
+    async def get(self):
+        now = time.time()
+        token = self._token
+        if self._fresh(token, now):
+            return token["value"]
+        if self._usable(token, now):
+            # still valid: refresh behind the caller instead of in front of it
+            self._refresh_soon()
+            return token["value"]
+        return (await self.refresh())["value"]
+
+    def _refresh_soon(self):
+        if self._inflight is None:
+            self._inflight = asyncio.ensure_future(self._do_refresh())
+            self._inflight.add_done_callback(self._clear_inflight)
+
+    def _clear_inflight(self, fut):
+        self._inflight = None
+        if not fut.cancelled():
+            fut.exception()  # mark retrieved; callers awaiting it still see it
+
+    async def refresh(self):
+        self._refresh_soon()
+        return await asyncio.shield(self._inflight)
+
+    async def _do_refresh(self):
+        now = time.time()
+        shared = await asyncio.to_thread(self.store.read)
+        if self._fresh(shared, now):
+            self._token = shared
+            return shared
+
+        fd = await asyncio.to_thread(self.store.acquire)
+        try:
+            # another worker may have refreshed while we waited for the lock
+            shared = await asyncio.to_thread(self.store.read)
+            now = time.time()
+            if self._fresh(shared, now):
+                self._token = shared
+                return shared
+
+            try:
+                with stage("iam_fetch"):
+                    data = await fetch_iam_token(self.api_key)
+            except Exception:
+                IAM_REFRESHES.inc(result="error")
+                raise
+            IAM_REFRESHES.inc(result="ok")
+            lifetime = int(data.get("expires_in") or 3600)
+            issued = time.time()
+            token = {
+                "value": data["access_token"],
+                "expiry": issued + lifetime,
+                "refresh_at": issued + lifetime * REFRESH_FRACTION,
+            }
+            await asyncio.to_thread(self.store.write, token)
+            self._token = token
+            return token
+        finally:
+            await asyncio.to_thread(self.store.release, fd)
+
+    async def _refresh_loop(self):
+        while True:
+            try:
+                token = await self.refresh()
+                delay = max(token["refresh_at"] - time.time(), 1)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                ERRORS.inc(cause="iam_refresh")
+                logger.exception("IAM refresh failed")
+                delay = 5
+            await asyncio.sleep(delay)
+
+    def start(self):
+        if self._bg_task is None:
+            self._bg_task = asyncio.ensure_future(self._refresh_loop())
+
+    async def stop(self):
+        if self._bg_task is not None:
+            self._bg_task.cancel()
+            try:
+                await self._bg_task
+            except asyncio.CancelledError:
+                pass
+            self._bg_task = None
@@ -0,0 +1,248 @@
+"""
+Meeting-end webhook ingestion. POST /api/hooks/meeting only validates and
+persists the meeting, deduplicated on meeting_id, and answers 202; a bounded
+pool of asyncio workers then parses queued meetings in priority order, so a
+burst of meetings ending on the hour waits in the queue instead of timing
+out the webhook callers.
+"""
+import asyncio, json, logging, os, sqlite3, threading, time
+
+from metrics import Counter
+
+
+logger = logging.getLogger(__name__)
+
+INGEST_WORKERS = int(os.getenv("INGEST_WORKERS", 4))
+INGEST_MAX_ATTEMPTS = int(os.getenv("INGEST_MAX_ATTEMPTS", 3))
+INGEST_RETRY_DELAY_S = float(os.getenv("INGEST_RETRY_DELAY_S", 30))
+# a "running" meeting older than this belonged to a worker that died or errored; the sweep queues it again
+INGEST_LEASE_S = float(os.getenv("INGEST_LEASE_S", 600))
+INGEST_SWEEP_S = float(os.getenv("INGEST_SWEEP_S", 60))
+# 0 is most urgent
+PRIORITIES = range(10)
+DEFAULT_PRIORITY = 5
+
+INGESTS = Counter("nlp_parser_meeting_ingests_total", "Webhook meetings parsed, by result.", ["result"])
+
+
+class RetryLater(Exception):
+    """Raised by the parse callable for failures worth another attempt (upstream down, timeouts)."""
+
+
+class MeetingJobStore:
+    """One row per meeting_id, in the action store's SQLite file."""
+
+    def __init__(self, path):
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=10, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS meeting_jobs (
+                    meeting_id TEXT PRIMARY KEY,
+                    priority INTEGER NOT NULL,
+                    status TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    actions INTEGER,
+                    error TEXT,
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL
+                )"""
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS meeting_jobs_queue ON meeting_jobs(status, priority, created_at)"
+            )
+
+    def enqueue(self, meeting_id, payload, priority=DEFAULT_PRIORITY):
+        """
+        Returns (job, created). A meeting already queued, running or parsed is
+        a duplicate delivery and keeps its job; a failed one is queued again.
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                created = self._conn.execute(
+                    """INSERT INTO meeting_jobs (meeting_id, priority, status, payload, created_at, updated_at)
+                       VALUES (?, ?, 'queued', ?, ?, ?) ON CONFLICT(meeting_id) DO NOTHING""",
+                    (meeting_id, priority, json.dumps(payload), now, now),
+                ).rowcount == 1
+                if not created:
+                    created = self._conn.execute(
+                        """UPDATE meeting_jobs SET status = 'queued', priority = ?, payload = ?, attempts = 0,
+                                                   error = NULL, updated_at = ?
+                           WHERE meeting_id = ? AND status = 'failed'""",
+                        (priority, json.dumps(payload), now, meeting_id),
+                    ).rowcount == 1
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return self.get(meeting_id), created
+
+    def reclaim(self):
+        """
+        (priority, created_at, meeting_id) of meetings no worker is on: `running`
+        past the lease, or `queued` that long without being claimed. They are
+        reset to queued with a fresh timestamp, so each sweep hands them out once.
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                rows = self._conn.execute(
+                    """SELECT priority, created_at, meeting_id FROM meeting_jobs
+                       WHERE status IN ('queued', 'running') AND updated_at < ?""",
+                    (now - INGEST_LEASE_S,),
+                ).fetchall()
+                self._conn.executemany(
+                    "UPDATE meeting_jobs SET status = 'queued', updated_at = ? WHERE meeting_id = ?",
+                    [(now, r[2]) for r in rows],
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return [tuple(r) for r in rows]
+
+    def queued(self):
+        """(priority, created_at, meeting_id) still to parse."""
+        with self._lock:
+            return [tuple(r) for r in self._conn.execute(
+                "SELECT priority, created_at, meeting_id FROM meeting_jobs WHERE status = 'queued'"
+            )]
+
+    def claim(self, meeting_id):
+        """(payload, attempts) if this worker won the meeting, else None."""
+        with self._lock:
+            # conditional update: exactly one worker (in any process) wins the meeting
+            won = self._conn.execute(
+                """UPDATE meeting_jobs SET status = 'running', attempts = attempts + 1, updated_at = ?
+                   WHERE meeting_id = ? AND status = 'queued'""",
+                (time.time(), meeting_id),
+            ).rowcount == 1
+            if not won:
+                return None
+            row = self._conn.execute(
+                "SELECT payload, attempts FROM meeting_jobs WHERE meeting_id = ?", (meeting_id,)
+            ).fetchone()
+        return json.loads(row["payload"]), row["attempts"]
+
+    def finish(self, meeting_id, status, actions=None, error=None):
+        with self._lock:
+            self._conn.execute(
+                "UPDATE meeting_jobs SET status = ?, actions = ?, error = ?, updated_at = ? WHERE meeting_id = ?",
+                (status, actions, error, time.time(), meeting_id),
+            )
+
+    def get(self, meeting_id):
+        with self._lock:
+            row = self._conn.execute(
+                """SELECT meeting_id, priority, status, attempts, actions, error, created_at, updated_at
+                   FROM meeting_jobs WHERE meeting_id = ?""",
+                (meeting_id,),
+            ).fetchone()
+        return dict(row) if row else None
+
+    def depth(self):
+        with self._lock:
+            return dict(self._conn.execute(
+                "SELECT status, COUNT(*) FROM meeting_jobs WHERE status IN ('queued', 'running') GROUP BY status"
+            ).fetchall())
+
+
+class IngestQueue:
+    """Priority queue of meeting_ids drained by `workers` tasks calling `parse(payload)` -> document."""
+
+    def __init__(self, jobs, parse, workers=INGEST_WORKERS):
+        self.jobs = jobs
+        self.parse = parse
+        self.workers = workers
+        self.queue = None
+        self._tasks = []
+        self._retries = set()
+
+    def start(self):
+        """Spawn the worker pool (idempotent) and re-queue meetings left over from a previous run."""
+        if self._tasks:
+            return
+        self.queue = asyncio.PriorityQueue()
+        self._tasks = [asyncio.ensure_future(self._worker()) for _ in range(self.workers)]
+        self._tasks.append(asyncio.ensure_future(self._resume()))
+        self._tasks.append(asyncio.ensure_future(self._sweep()))
+
+    async def stop(self):
+        for task in self._tasks + list(self._retries):
+            task.cancel()
+        await asyncio.gather(*self._tasks, *self._retries, return_exceptions=True)
+        self._tasks = []
+        self._retries.clear()
+
+    async def _resume(self):
+        await asyncio.to_thread(self.jobs.reclaim)
+        for item in await asyncio.to_thread(self.jobs.queued):
+            self.queue.put_nowait(item)
+
+    async def _sweep(self):
+        # meetings whose worker errored out or died, in this process or another
+        while True:
+            await asyncio.sleep(INGEST_SWEEP_S)
+            try:
+                for item in await asyncio.to_thread(self.jobs.reclaim):
+                    self.queue.put_nowait(item)
+            except Exception:
+                logger.exception("ingest lease sweep failed")
+
+    async def submit(self, meeting_id, payload, priority=DEFAULT_PRIORITY):
+        """Persist and queue a meeting; returns (job, created)."""
+        self.start()
+        job, created = await asyncio.to_thread(self.jobs.enqueue, meeting_id, payload, priority)
+        if created:
+            self.queue.put_nowait((job["priority"], job["created_at"], meeting_id))
+        return job, created
+
+    async def _retry_later(self, item):
+        await asyncio.sleep(INGEST_RETRY_DELAY_S)
+        self.queue.put_nowait(item)
+
+    async def _worker(self):
+        while True:
+            item = await self.queue.get()
+            try:
+                await self._ingest(item)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                # bookkeeping failure (e.g. database locked); the lease sweep queues the meeting again
+                INGESTS.inc(result="error")
+                logger.exception("ingest worker error on %s", item[2])
+            finally:
+                self.queue.task_done()
+
+    async def _ingest(self, item):
+        meeting_id = item[2]
+        claimed = await asyncio.to_thread(self.jobs.claim, meeting_id)
+        if claimed is None:
+            return
+        payload, attempts = claimed
+        try:
+            parsed = await self.parse(payload)
+        except RetryLater as e:
+            if attempts < INGEST_MAX_ATTEMPTS:
+                INGESTS.inc(result="retried")
+                await asyncio.to_thread(self.jobs.finish, meeting_id, "queued", error=str(e))
+                retry = asyncio.ensure_future(self._retry_later(item))
+                self._retries.add(retry)
+                retry.add_done_callback(self._retries.discard)
+                return
+            INGESTS.inc(result="failed")
+            await asyncio.to_thread(self.jobs.finish, meeting_id, "failed", error=str(e))
+            return
+        except Exception as e:
+            INGESTS.inc(result="failed")
+            await asyncio.to_thread(self.jobs.finish, meeting_id, "failed", error=str(e) or type(e).__name__)
+            return
+        INGESTS.inc(result="parsed")
+        await asyncio.to_thread(self.jobs.finish, meeting_id, "parsed", actions=len(parsed.get("actions", [])))
@@ -0,0 +1,72 @@
+import json
+
+
+CLOSERS = {"{": "}", "[": "]"}
+
+
+def _scan(text, start):
+    """
+    One pass from the `{` at `start`. Returns (end, cut, open_stack):
+    end is the index after the matching `}` (None if the text ran out),
+    cut/open_stack describe the last point where the prefix can be closed off
+    into valid JSON without keeping a half-written value.
+    """
+    stack = []
+    in_string = escape = False
+    cut, open_stack = start, []
+    for i in range(start, len(text)):
+        c = text[i]
+        if in_string:
+            if escape:
+                escape = False
+            elif c == "\\":
+                escape = True
+            elif c == '"':
+                in_string = False
+            continue
+        if c == '"':
+            in_string = True
+        elif c in "{[":
+            stack.append(c)
+            if len(stack) <= 2:
+                cut, open_stack = i + 1, stack[:]
+        elif c in "}]":
+            if not stack or CLOSERS[stack[-1]] != c:
+                return i + 1, cut, open_stack  # mismatched: let json.loads report it
+            stack.pop()
+            if not stack:
+                return i + 1, None, None
+            if len(stack) <= 2:
+                cut, open_stack = i + 1, stack[:]
+        elif c == "," and len(stack) <= 2:
+            # everything before a comma at the top two levels is a complete value
+            cut, open_stack = i, stack[:]
+    return None, cut, open_stack
+
+
+def extract_object(text):
+    """
+    Find and decode the outermost JSON object in model output, ignoring code
+    fences and chatter around it. Runs in a single left-to-right pass.
+
+    If the output was cut off (e.g. at max_tokens), the object is repaired by
+    dropping the trailing partial value - normally the half-written last
+    action - and closing the open arrays/objects.
+
+    Returns (obj, repaired). Raises ValueError if no object can be recovered.
+    """
+    pos = text.find("{")
+    while pos != -1:
+        end, cut, open_stack = _scan(text, pos)
+        if end is None:
+            repaired = text[pos:cut].rstrip().rstrip(",") + "".join(CLOSERS[c] for c in reversed(open_stack))
+            return json.loads(repaired), True
+        try:
+            obj = json.loads(text[pos:end])
+            if isinstance(obj, dict):
+                return obj, False
+        except ValueError:
+            pass
+        # not an object after all (e.g. braces in prose): resume after it
+        pos = text.find("{", end)
+    raise ValueError("no JSON object found")
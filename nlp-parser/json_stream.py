@@ -0,0 +1,79 @@
+import json
+
+
+class ActionStreamParser:
+    """
+    Incremental scanner over streamed model output.
+
+    Feed text deltas as they arrive; every time an element of the top-level
+    `actions` array closes, it is decoded and returned. Anything before the
+    first `{` (code fences, chatter) is skipped. State carries across feeds,
+    so each character is looked at once.
+    """
+
+    def __init__(self, key="actions"):
+        self.key = key
+        self.text = ""
+        self.pos = 0
+        self.stack = []
+        self.in_string = False
+        self.escape = False
+        self.string_start = None
+        self.last_string = None
+        self.current_key = None
+        self.array_depth = None  # stack depth just inside the `actions` array
+        self.item_start = None
+
+    def feed(self, delta):
+        self.text += delta
+        text = self.text
+        items = []
+        for i in range(self.pos, len(text)):
+            c = text[i]
+            if self.in_string:
+                if self.escape:
+                    self.escape = False
+                elif c == "\\":
+                    self.escape = True
+                elif c == '"':
+                    self.in_string = False
+                    if len(self.stack) == 1:
+                        try:
+                            self.last_string = json.loads(text[self.string_start:i + 1])
+                        except ValueError:
+                            self.last_string = None
+                continue
+
+            if not self.stack and c != "{":
+                continue  # preamble before the top-level object
+            if c == '"':
+                self.in_string = True
+                self.string_start = i
+            elif c == ":" and len(self.stack) == 1:
+                self.current_key = self.last_string
+            elif c == "," and len(self.stack) == 1:
+                self.current_key = None
+            elif c in "{[":
+                self.stack.append(c)
+                if c == "[" and len(self.stack) == 2 and self.current_key == self.key:
+                    self.array_depth = 2
+                elif c == "{" and self.array_depth and len(self.stack) == self.array_depth + 1:
+                    self.item_start = i
+            elif c in "}]":
+                if not self.stack:
+                    continue
+                closing_item = (
+                    c == "}" and self.item_start is not None
+                    and len(self.stack) == self.array_depth + 1
+                )
+                self.stack.pop()
+                if closing_item:
+                    try:
+                        items.append(json.loads(text[self.item_start:i + 1]))
+                    except ValueError:
+                        pass
+                    self.item_start = None
+                elif c == "]" and self.array_depth and len(self.stack) == self.array_depth - 1:
+                    self.array_depth = None
+        self.pos = len(text)
+        return items
@@ -1,164 +1,932 @@
-from fastapi import FastAPI, HTTPException
-from pydantic import BaseModel
-import requests, os, json, time
-from jsonschema import validate, ValidationError
+from contextlib import asynccontextmanager, contextmanager
+from typing import List
+from fastapi import FastAPI, HTTPException, Query, Request, Response
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import BaseModel, ValidationError as PydanticValidationError
+from starlette.requests import ClientDisconnect
+import asyncio, copy, hashlib, os, json, time
+import httpx
+from jsonschema import ValidationError
 from dotenv import load_dotenv
 load_dotenv()  # loads .env file automatically
 
+from watsonx_client import call_watsonx, stream_watsonx, close_client, DEFAULT_MODEL_ID, WATSONX_TIMEOUT
+from action_store import ActionStore
+from action_events import ChangeFeed
+from align import Aligner, SpanIndex, align_actions
+from participants import Resolver, resolve_assignees
+from dates import DueDates, resolve_due_dates
+from dedupe import DuplicateIndex, DEDUPE_ENABLED
+from execution import ExecutionEngine, JobStore
+from sessions import SessionManager
+from ingest import IngestQueue, MeetingJobStore, RetryLater, DEFAULT_PRIORITY, PRIORITIES
+from iam_token import IAMTokenManager
+from result_cache import ResultCache, cache_key
+from schema import SCHEMA_VERSION, check_document, action_errors
+from json_stream import ActionStreamParser
+from json_extract import extract_object
+from rules import extract as extract_rules
+from prompt import build_prompt, usage_report, sum_usage, PROMPT_VERSION
+from chunking import make_windows, merge_actions, estimate_tokens, CHUNK_TOKEN_BUDGET
+from timing import collect, stage, server_timing
+from metrics import (
+    Counter, Gauge, render as render_metrics, ERRORS, TOKENS, MODEL_CALLS_AVOIDED, REJECTED_ACTIONS,
+    HTTP_REQUESTS, HTTP_SECONDS,
+)
+from resilience import CircuitOpen, DeadlineExceeded, deadline, remaining, from_env as resilient_from_env
 
-_cached_token = {"value": None, "expiry": 0}
 
+_token_managers = {}
 
-def get_cached_iam_token(api_key):
-    now = time.time()
-    if _cached_token["value"] and now < _cached_token["expiry"]:
-        return _cached_token["value"]
 
+def get_token_manager(api_key):
+    manager = _token_managers.get(api_key)
+    if manager is None:
+        manager = _token_managers[api_key] = IAMTokenManager(api_key)
+    return manager
 
-    url = "https://iam.cloud.ibm.com/identity/token"
-    resp = requests.post(
-        url,
-        data={
-            "grant_type": "urn:ibm:params:oauth:grant-type:apikey",
-            "apikey": api_key,
-        },
-        headers={"Content-Type": "application/x-www-form-urlencoded"},
-    )
-    resp.raise_for_status()
 
+async def get_cached_iam_token(api_key):
+    return await get_token_manager(api_key).get()
 
-    token = resp.json()["access_token"]
-    _cached_token["value"] = token
-    _cached_token["expiry"] = now + 55 * 60  # cache for 55 minutes
-    return token
 
+_result_cache = None
 
-# Load your schema (use uploaded path)
-SCHEMA_PATH = os.path.join(os.path.dirname(__file__), "meeting_action_schema.json")
 
+def get_result_cache():
+    global _result_cache
+    if _result_cache is None:
+        _result_cache = ResultCache()
+    return _result_cache
 
-with open(SCHEMA_PATH) as f:
-    SCHEMA = json.load(f)
 
+_action_store = None
 
-app = FastAPI()
+
+def get_action_store():
+    global _action_store
+    if _action_store is None:
+        _action_store = ActionStore()
+    return _action_store
+
+
+_duplicate_index = None
+
+
+def get_duplicate_index():
+    global _duplicate_index
+    if _duplicate_index is None:
+        _duplicate_index = DuplicateIndex(get_action_store().path)
+    return _duplicate_index
+
+
+_change_feed = None
+
+
+def get_change_feed():
+    global _change_feed
+    if _change_feed is None:
+        _change_feed = ChangeFeed(get_action_store())
+    return _change_feed
+
+
+_execution_engine = None
+
+
+def get_execution_engine():
+    global _execution_engine
+    if _execution_engine is None:
+        store = get_action_store()
+        _execution_engine = ExecutionEngine(store, JobStore(store.path))
+    return _execution_engine
+
+
+_ingest_queue = None
+
+
+def get_ingest_queue():
+    global _ingest_queue
+    if _ingest_queue is None:
+        _ingest_queue = IngestQueue(MeetingJobStore(get_action_store().path), ingest_meeting)
+    return _ingest_queue
+
+
+_session_manager = None
+
+
+def get_session_manager():
+    global _session_manager
+    if _session_manager is None:
+        _session_manager = SessionManager(extract_session_window)
+    return _session_manager
+
+
+async def store_actions(parsed):
+    if DEDUPE_ENABLED:
+        # before storing, so the stored payload and the response carry metadata.duplicate_of
+        with stage("dedupe"):
+            await asyncio.to_thread(get_duplicate_index().mark, parsed)
+    # every validated parse lands in the action store the dashboard reads from
+    with stage("store"):
+        await asyncio.to_thread(get_action_store().upsert_document, parsed)
+
+
+@asynccontextmanager
+async def lifespan(app):
+    api_key = os.getenv("WATSONX_APIKEY")
+    if api_key:
+        # warm the token and keep it fresh off the request path
+        get_token_manager(api_key).start()
+    # picks up execution jobs a previous run left unfinished
+    get_execution_engine().start()
+    get_ingest_queue().start()
+    yield
+    await get_ingest_queue().stop()
+    await get_session_manager().stop()
+    await get_execution_engine().stop()
+    for manager in _token_managers.values():
+        await manager.stop()
+    await close_client()
+
+
+app = FastAPI(lifespan=lifespan)
+
+
+@app.middleware("http")
+async def count_requests(request: Request, call_next):
+    started = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        # label by route template, not raw path, to keep series bounded
+        route = request.scope.get("route")
+        name = getattr(route, "path", "unmatched")
+        HTTP_REQUESTS.inc(route=name, status=status)
+        HTTP_SECONDS.observe(time.perf_counter() - started, route=name)
 
 
 class ParseRequest(BaseModel):
     meeting_id: str
     transcript: str
     source_text: str = None
+    no_cache: bool = False  # skip the result-cache lookup (the fresh result is still stored)
+    salvage: bool = True  # drop invalid actions into `rejected_actions` instead of failing the request
+    chunked: bool = None  # None: chunk only when the transcript exceeds CHUNK_TOKEN_BUDGET
+    fast_path: bool = True  # run the local rule extractor first; skip the model when it is confident
+    deadline_s: float = None  # overall time budget for this request; defaults to PARSE_DEADLINE_S
+    meeting_date: str = None  # anchor for relative due dates; defaults to the transcript's [Date: ...] header
 
 
-# helper: call watsonx.ai prompt endpoint (replace with your endpoint/project)
-def call_watsonx(prompt, iam_token, endpoint_url, project_id):
-    # Correct watsonx.ai text-chat endpoint from Prompt Lab
-    url = "https://us-south.ml.cloud.ibm.com/ml/v1/text/chat?version=2023-05-29"
+# default end-to-end budget for one /parse request, retries and backoff included
+PARSE_DEADLINE_S = float(os.getenv("PARSE_DEADLINE_S", 120))
 
+# retries, circuit breaker and optional hedging for model calls (WATSONX_MAX_ATTEMPTS, WATSONX_HEDGE, ...)
+watsonx_caller = resilient_from_env("watsonx", "WATSONX", WATSONX_TIMEOUT.read)
 
-    headers = {
-        "Accept": "application/json",
-        "Content-Type": "application/json",
-        "Authorization": f"Bearer {iam_token}"
-    }
 
+@contextmanager
+def upstream_errors():
+    """Translate upstream failures into the status codes our callers (webhook, UI) act on."""
+    try:
+        yield
+    except CircuitOpen as e:
+        ERRORS.inc(cause="circuit_open")
+        raise HTTPException(status_code=503, detail=str(e))
+    except (DeadlineExceeded, asyncio.TimeoutError, httpx.TimeoutException):
+        ERRORS.inc(cause="deadline")
+        raise HTTPException(status_code=504, detail="watsonx request timed out")
+    except httpx.HTTPStatusError as e:
+        ERRORS.inc(cause="upstream_status")
+        raise HTTPException(status_code=502, detail=f"watsonx returned {e.response.status_code}")
+    except httpx.TransportError as e:
+        ERRORS.inc(cause="upstream_unreachable")
+        raise HTTPException(status_code=502, detail=f"watsonx unreachable: {e}")
+
+
+def extract_json(assistant_text):
+    try:
+        with stage("extract"):
+            parsed, repaired = extract_object(assistant_text)
+    except ValueError:
+        ERRORS.inc(cause="invalid_json")
+        raise HTTPException(status_code=500, detail="Model output not valid JSON")
+    if repaired:
+        # output hit max_tokens: the partial last action was dropped
+        ERRORS.inc(cause="truncated")
+        parsed["truncated"] = True
+    return parsed
 
-    body = {
-        "messages": [
-            {
-                "role": "system",
-                "content": "You extract meeting actions as JSON. Respond only with valid JSON."
-            },
-            {
-                "role": "user",
-                "content": prompt
-            }
-        ],
-        # 👇 Use your actual project ID from watsonx.ai Prompt Lab
-        "project_id": "a17cc766-44a8-40b9-ab15-a6762c3b8c4e",
-        # 👇 You can use the same model you saw in Prompt Lab
-        "model_id": "meta-llama/llama-3-3-70b-instruct",
-        "max_tokens": 2000,
-        "temperature": 0.2,
-        "top_p": 1
-    }
 
+def record_tokens(usage):
+    TOKENS.inc(usage.get("prompt_tokens", 0), kind="prompt")
+    TOKENS.inc(usage.get("completion_tokens", 0), kind="completion")
 
-    # Send request
-    r = requests.post(url, headers=headers, json=body)
-    print("WATSONX URL:", url)
-    print("STATUS:", r.status_code)
-    print("BODY:", r.text)
 
+def validate_document(parsed, salvage=True):
+    try:
+        with stage("validate"):
+            check_document(parsed, salvage)
+    except ValidationError as e:
+        ERRORS.inc(cause="schema_validation")
+        raise HTTPException(status_code=500, detail=f"Validation error: {e.message}")
 
-    r.raise_for_status()
-    return r.json()
 
+async def watsonx_credentials():
+    api_key = os.getenv("WATSONX_APIKEY")
+    if not api_key:
+        ERRORS.inc(cause="missing_credentials")
+        raise HTTPException(status_code=500, detail="WATSONX_APIKEY not set in env")
+    endpoint_url = os.getenv("WATSONX_ENDPOINT")
+    project_id = os.getenv("WATSONX_PROJECT_ID")
+    with stage("iam"):
+        iam = await get_cached_iam_token(api_key)
+    return iam, endpoint_url, project_id
+
+
+def rule_pass(transcript, req):
+    """Returns (document, hints): a finished document when the rules are confident enough, else prompt hints."""
+    if not req.fast_path:
+        return None, None
+    with stage("rules"):
+        result = extract_rules(transcript)
+    if result.confident:
+        parsed = {"meeting_id": req.meeting_id, "actions": result.actions,
+                  "usage": {"prompt_tokens": 0, "completion_tokens": 0, "model_skipped": True}}
+        validate_document(parsed, req.salvage)
+        MODEL_CALLS_AVOIDED.inc(reason="rules")
+        return parsed, None
+    return None, result.actions
+
+
+def document_from_response(model_resp, prompt, req, cached=False):
+    """Validated document from a (fresh or cached) chat completion for `prompt`."""
+    try:
+        assistant_text = model_resp["choices"][0]["message"]["content"]
+    except Exception:
+        ERRORS.inc(cause="bad_response_shape")
+        raise HTTPException(status_code=500, detail="Unexpected model response structure")
+
+    parsed = extract_json(assistant_text)
+    parsed.setdefault("meeting_id", req.meeting_id)
+    validate_document(parsed, req.salvage)
+    parsed["usage"] = usage_report(prompt, model_resp, cached=cached)
+    return parsed
 
 
+async def parse_window(transcript, req):
+    """Rules -> prompt -> (cached) model call -> JSON -> validated document, for one transcript or window."""
+    parsed, hints = rule_pass(transcript, req)
+    if parsed is not None:
+        return parsed
+
+    with stage("prompt"):
+        prompt = build_prompt(transcript, hints)
+
+    cache = get_result_cache()
+    key = prompt_cache_key(transcript, prompt, hints)
+    with stage("cache"):
+        model_resp = None if req.no_cache else await cache.get(key)
+    fresh = model_resp is None
+
+    if fresh:
+        iam, endpoint_url, project_id = await watsonx_credentials()
+        with upstream_errors(), stage("model"):
+            model_resp = await watsonx_caller.call(
+                lambda timeout: call_watsonx(prompt.text, iam, endpoint_url, project_id, prompt.params, timeout)
+            )
+        record_tokens(model_resp.get("usage") or {})
+    else:
+        MODEL_CALLS_AVOIDED.inc(reason="cache")
+
+    parsed = document_from_response(model_resp, prompt, req, cached=not fresh)
+
+    # only cache responses that made it through validation
+    if fresh:
+        await cache.put(key, model_resp)
+    return parsed
+
+
+async def parse_chunked(req):
+    # windows go to the model concurrently, so latency tracks the slowest window
+    windows = make_windows(req.transcript)
+    docs = await asyncio.gather(*(parse_window(w.text, req) for w in windows))
+    # the model reports no offsets; locate each window's actions in its own text so overlap copies can be matched
+    with stage("align"):
+        for w, d in zip(windows, docs):
+            align_actions(d.get("actions", []), w.text)
+    merged = {
+        "meeting_id": req.meeting_id,
+        "actions": merge_actions([(w, d.get("actions", [])) for w, d in zip(windows, docs)]),
+    }
+    rejected = [dict(r, window=w.index) for w, d in zip(windows, docs) for r in d.get("rejected_actions", [])]
+    if rejected:
+        merged["rejected_actions"] = rejected
+    if any(d.get("truncated") for d in docs):
+        merged["truncated"] = True
+    merged["usage"] = sum_usage(d.get("usage", {}) for d in docs)
+    return merged
+
 
 @app.post("/parse")
-async def parse(req: ParseRequest):
+async def parse(req: ParseRequest, response: Response = None):
     # Basic sanity
     if not req.transcript.strip():
         raise HTTPException(status_code=400, detail="Empty transcript")
 
+    chunked = req.chunked
+    if chunked is None:
+        chunked = estimate_tokens(req.transcript) > CHUNK_TOKEN_BUDGET
+
+    with collect() as timings:
+        with stage("total"), deadline(req.deadline_s or PARSE_DEADLINE_S):
+            if chunked:
+                parsed = await parse_chunked(req)
+            else:
+                parsed = await parse_window(req.transcript, req)
+            parsed = finalize_document(parsed, req)
+            await store_actions(parsed)
+
+    if response is not None:
+        # per-stage durations for load tests and browser devtools
+        response.headers["Server-Timing"] = server_timing(timings)
+    return parsed
 
-    # Build prompt (concise)
-    prompt = f"""
-You are a parser that extracts meeting actions as JSON array `actions` following this schema:
-{json.dumps(SCHEMA['properties']['actions'], indent=2)}
 
+def _generated_at():
+    return time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
 
-Return ONLY the JSON object with keys: meeting_id, source_text, generated_at, actions
-Transcript:
-\"\"\"{req.transcript}\"\"\"
-"""
 
+def local_stages(req, generated_at, index=None):
+    """
+    The local stages of finalize_document (span, assignees, due date) for one
+    action at a time, for streamed actions; indexes and anchor are built once.
+    """
+    aligner = Aligner(req.transcript, index)
+    resolver = Resolver(req.transcript)
+    dates = DueDates(req.transcript, req.meeting_date, generated_at)
 
-    api_key = os.getenv("WATSONX_APIKEY")
-    if not api_key:
-        raise HTTPException(status_code=500, detail="WATSONX_APIKEY not set in env")
-    endpoint_url = os.getenv("WATSONX_ENDPOINT")
-    project_id = os.getenv("WATSONX_PROJECT_ID")
+    def enrich(action):
+        aligner.align(action)
+        resolver.assign(action)
+        return dates.resolve(action)
 
+    return enrich
 
-    iam = get_cached_iam_token(api_key)
-    model_resp = call_watsonx(prompt, iam, endpoint_url, project_id)
 
+def finalize_document(parsed, req, index=None):
+    parsed.setdefault("meeting_id", req.meeting_id)
+    parsed.setdefault("source_text", req.source_text or req.transcript)
+    parsed.setdefault("generated_at", _generated_at())
+
+    # offsets, speaker and context come from the transcript, not the model
+    with stage("align"):
+        align_actions(parsed.get("actions", []), req.transcript, index)
+    with stage("assignees"):
+        resolve_assignees(parsed.get("actions", []), req.transcript)
+    with stage("dates"):
+        resolve_due_dates(parsed.get("actions", []), req.transcript, req.meeting_date, parsed["generated_at"])
+    validate_document(parsed, req.salvage)
+    REJECTED_ACTIONS.inc(len(parsed.get("rejected_actions", [])))
 
-    try:
-        assistant_text = model_resp["choices"][0]["message"]["content"]
-    except Exception:
-        raise HTTPException(status_code=500, detail="Unexpected model response structure")
+    return parsed
 
 
-    import re
-    assistant_text = assistant_text.strip()
-    assistant_text = re.sub(r"^```(?:[\s\S]*?\n)?", "", assistant_text)  # remove opening ``` and optional language
-    assistant_text = re.sub(r"```$", "", assistant_text).strip()        # remove trailing ```
+def _sse(event, data, id=None):
+    head = f"id: {id}\n" if id is not None else ""
+    return f"{head}event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def prompt_cache_key(transcript, prompt, hints):
+    return cache_key(transcript, SCHEMA_VERSION, DEFAULT_MODEL_ID, {**prompt.cache_params, "hints": bool(hints)})
+
+
+def _action_event(action, enrich=None):
+    errors = action_errors(action)
+    if errors:
+        return _sse("rejected", {"action": action, "errors": errors})
+    # a copy, so the document still goes through finalize_document from the model's output
+    return _sse("action", enrich(copy.deepcopy(action)) if enrich else action)
+
+
+async def _stream_window(req):
+    """SSE events for one window: `action`/`rejected` as each element closes, then `document`."""
+    transcript = req.transcript
+    generated_at = _generated_at()
+    # the same local stages finalize_document runs, so streamed actions match the final document;
+    # both align against one index of the transcript
+    index = SpanIndex(transcript)
+    enrich = local_stages(req, generated_at, index)
+    parsed, hints = rule_pass(transcript, req)
+    prompt = build_prompt(transcript, hints)
+    cache = get_result_cache()
+    key = prompt_cache_key(transcript, prompt, hints)
+    with stage("cache"):
+        cached = None if parsed is not None or req.no_cache else await cache.get(key)
+
+    if parsed is not None or cached is not None:
+        if parsed is None:
+            MODEL_CALLS_AVOIDED.inc(reason="cache")
+            parsed = document_from_response(cached, prompt, req, cached=True)
+        for action in parsed.get("actions", []):
+            yield _action_event(action, enrich)
+    else:
+        iam, endpoint_url, project_id = await watsonx_credentials()
+        scanner = ActionStreamParser()
+        usage = {}
+        # a stream cannot be retried once actions went out; breaker and deadline still apply
+        with upstream_errors():
+            async with watsonx_caller.guard() as budget:
+                async for delta in stream_watsonx(prompt.text, iam, endpoint_url, project_id, prompt.params, usage, budget):
+                    for action in scanner.feed(delta):
+                        yield _action_event(action, enrich)
+                    if remaining(1) <= 0:
+                        raise DeadlineExceeded("watsonx stream exceeded the request deadline")
+
+        parsed = extract_json(scanner.text)
+        parsed.setdefault("meeting_id", req.meeting_id)
+        validate_document(parsed, req.salvage)
+        # same shape as a non-streamed response so /parse can reuse it
+        model_resp = {"choices": [{"message": {"content": scanner.text}}], "usage": usage}
+        record_tokens(usage)
+        parsed["usage"] = usage_report(prompt, model_resp)
+        await cache.put(key, model_resp)
+
+    parsed.setdefault("generated_at", generated_at)
+    parsed = finalize_document(parsed, req, index)
+    await store_actions(parsed)
+    yield _sse("document", parsed)
+
+
+@app.post("/parse/stream")
+async def parse_stream(req: ParseRequest):
+    """
+    Server-sent events: one `action` event per element of `actions` as soon as
+    it closes and passes item validation (`rejected` otherwise), then a final
+    `document` event with the full validated result, or an `error` event.
+    """
+    if not req.transcript.strip():
+        raise HTTPException(status_code=400, detail="Empty transcript")
 
+    chunked = req.chunked
+    if chunked is None:
+        chunked = estimate_tokens(req.transcript) > CHUNK_TOKEN_BUDGET
+
+    async def events():
+        try:
+            with deadline(req.deadline_s or PARSE_DEADLINE_S):
+                if chunked:
+                    # windows finish out of order; emit once they are merged and finalized
+                    parsed = finalize_document(await parse_chunked(req), req)
+                    for action in parsed["actions"]:
+                        yield _action_event(action)
+                    await store_actions(parsed)
+                    yield _sse("document", parsed)
+                else:
+                    async for event in _stream_window(req):
+                        yield event
+        except HTTPException as e:
+            yield _sse("error", {"status": e.status_code, "detail": e.detail})
+        except Exception as e:
+            ERRORS.inc(cause="internal")
+            status = 502 if isinstance(e, httpx.HTTPError) else 500
+            yield _sse("error", {"status": status, "detail": str(e)})
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+
+BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", 8))
+
+
+async def _parse_record(lineno, line):
+    try:
+        req = ParseRequest(**json.loads(line))
+    except (ValueError, TypeError, PydanticValidationError) as e:
+        return {"line": lineno, "ok": False, "status": 422, "error": str(e)}
 
     try:
-        parsed = json.loads(assistant_text)
-    except Exception:
-        m = re.search(r'(\{[\s\S]*\})', assistant_text)
-        if m:
-            parsed = json.loads(m.group(1))
-        else:
-            raise HTTPException(status_code=500, detail="Model output not valid JSON")
+        result = await parse(req)
+    except HTTPException as e:
+        return {"line": lineno, "meeting_id": req.meeting_id, "ok": False, "status": e.status_code, "error": e.detail}
+    except Exception as e:
+        ERRORS.inc(cause="internal")
+        status = 502 if isinstance(e, httpx.HTTPError) else 500
+        return {"line": lineno, "meeting_id": req.meeting_id, "ok": False, "status": status, "error": str(e)}
+    return {"line": lineno, "meeting_id": req.meeting_id, "ok": True, "result": result}
+
+
+async def _body_lines(request):
+    """Lines of the request body as they arrive, without buffering the whole upload."""
+    pending = b""
+    async for chunk in request.stream():
+        lines = (pending + chunk).split(b"\n")
+        pending = lines.pop()
+        for line in lines:
+            yield line
+    if pending:
+        yield pending
+
+
+class UploadStreamingResponse(StreamingResponse):
+    """
+    Response streamed while the handler is still reading the request body.
+    Starlette's disconnect listener would swallow body chunks, so it only
+    starts once `body_read` is set.
+    """
+
+    def __init__(self, content, body_read, **kwargs):
+        super().__init__(content, **kwargs)
+        self.body_read = body_read
+
+    async def listen_for_disconnect(self, receive):
+        await self.body_read.wait()
+        await super().listen_for_disconnect(receive)
+
+
+@app.post("/parse/batch")
+async def parse_batch(request: Request):
+    """
+    Body: JSONL, one ParseRequest per line. Response: NDJSON, one result or
+    error per input line, written in completion order (use `line` to correlate).
+    Lines are scheduled as they arrive; reading pauses while BATCH_CONCURRENCY
+    records are in flight, so a large upload streams instead of buffering.
+    """
+    body_read = asyncio.Event()
+
+    async def stream():
+        queue = asyncio.Queue()
+        slots = asyncio.Semaphore(BATCH_CONCURRENCY)
+        tasks = []
+
+        async def run(lineno, line):
+            try:
+                await queue.put(await _parse_record(lineno, line))
+            finally:
+                slots.release()
+
+        async def feed():
+            try:
+                lineno = 0
+                async for line in _body_lines(request):
+                    lineno += 1
+                    if not line.strip():
+                        continue
+                    await slots.acquire()
+                    tasks.append(asyncio.create_task(run(lineno, line)))
+                body_read.set()
+                await asyncio.gather(*tasks)
+            except ClientDisconnect:
+                pass
+            finally:
+                body_read.set()
+                await queue.put(None)
+
+        feeder = asyncio.create_task(feed())
+        try:
+            while True:
+                item = await queue.get()
+                if item is None:
+                    break
+                yield json.dumps(item) + "\n"
+        finally:
+            # client went away: stop scheduling and drop in-flight records
+            feeder.cancel()
+            for t in tasks:
+                t.cancel()
+
+    return UploadStreamingResponse(stream(), body_read, media_type="application/x-ndjson")
+
+
+class SessionDelta(BaseModel):
+    text: str
+    seq: int = None  # increasing per delta; a repeated seq (client retry) is ignored
+    # extraction options, taken from the delta that opens the session
+    salvage: bool = True
+    fast_path: bool = True
+    no_cache: bool = False
+
+
+async def extract_session_window(text, session):
+    req = ParseRequest(meeting_id=session.meeting_id, transcript=text, **session.options)
+    with deadline(PARSE_DEADLINE_S):
+        parsed = await parse_window(text, req)
+    # window-relative spans, so the session can tell overlap copies from new actions
+    with stage("align"):
+        align_actions(parsed.get("actions", []), text)
+    return parsed
 
 
-    parsed.setdefault("meeting_id", req.meeting_id)
-    parsed.setdefault("source_text", req.source_text or req.transcript)
-    parsed.setdefault("generated_at", time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()))
+def _live_session(meeting_id):
+    session = get_session_manager().get(meeting_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="No live session for this meeting")
+    return session
+
+
+@app.post("/sessions/{meeting_id}/deltas")
+async def session_delta(meeting_id: str, delta: SessionDelta):
+    """
+    Append transcript text to the meeting's live session (opened by the first
+    delta). Completed speaker turns are extracted in the background once
+    enough of them have accumulated; the response is the session's progress.
+    """
+    manager = get_session_manager()
+    session = manager.open(meeting_id, {"salvage": delta.salvage, "fast_path": delta.fast_path, "no_cache": delta.no_cache})
+    accepted = manager.push(session, delta.text, delta.seq)
+    return {**session.snapshot(), "accepted": accepted}
+
+
+@app.get("/sessions/{meeting_id}")
+async def session_status(meeting_id: str, actions: bool = False):
+    return _live_session(meeting_id).snapshot(actions)
+
+
+@app.post("/sessions/{meeting_id}/end")
+async def session_end(meeting_id: str, response: Response = None):
+    """
+    Extract the turns not covered yet and return the merged, validated
+    document (same shape as /parse); its actions are stored like any parse.
+    A failed final extraction leaves the session open so /end can be retried.
+    """
+    session = _live_session(meeting_id)
+    with collect() as timings:
+        with stage("total"):
+            doc = await get_session_manager().close(meeting_id)
+            req = ParseRequest(meeting_id=meeting_id, transcript=session.transcript, **session.options)
+            parsed = finalize_document(doc, req)
+            await store_actions(parsed)
+    if response is not None:
+        response.headers["Server-Timing"] = server_timing(timings)
+    return parsed
+
 
+DEMO_TRANSCRIPT_PATH = os.getenv(
+    "DEMO_TRANSCRIPT_PATH", os.path.join(os.path.dirname(__file__), "..", "transcripts", "demo_transcript_1.txt")
+)
 
+
+class MeetingHook(BaseModel):
+    meeting_id: str
+    transcript: str = None
+    demo: bool = False  # no transcript: parse DEMO_TRANSCRIPT_PATH
+    priority: int = DEFAULT_PRIORITY  # 0 (most urgent) .. 9
+    timestamp: str = None  # when the meeting ended, as reported by the caller; informational
+    meeting_date: str = None  # anchor for relative due dates (see ParseRequest)
+
+
+async def ingest_meeting(payload):
+    """Queue worker body: the regular /parse pipeline; upstream trouble is retried later."""
     try:
-        validate(instance=parsed, schema=SCHEMA)
-    except ValidationError as e:
-        raise HTTPException(status_code=500, detail=f"Validation error: {e.message}")
+        return await parse(ParseRequest(**payload))
+    except HTTPException as e:
+        if e.status_code >= 500:
+            raise RetryLater(f"{e.status_code}: {e.detail}")
+        raise
+
+
+@app.post("/api/hooks/meeting")
+async def meeting_hook(hook: MeetingHook):
+    """
+    Meeting-end webhook: validates and persists the meeting, then answers 202
+    while a background worker parses it. A repeated meeting_id returns the
+    existing job with 200 (a failed one is queued again). Poll
+    GET /api/hooks/meeting/{meeting_id}, or watch /api/actions/events.
+    """
+    if not hook.meeting_id.strip():
+        raise HTTPException(status_code=422, detail="meeting_id is required")
+    if hook.priority not in PRIORITIES:
+        raise HTTPException(status_code=422, detail=f"priority must be {PRIORITIES[0]}-{PRIORITIES[-1]}")
+    transcript = hook.transcript
+    if not (transcript and transcript.strip()) and hook.demo:
+        with open(DEMO_TRANSCRIPT_PATH) as f:
+            transcript = f.read()
+    if not (transcript and transcript.strip()):
+        raise HTTPException(status_code=400, detail="Empty transcript")
+
+    payload = {"meeting_id": hook.meeting_id, "transcript": transcript}
+    if hook.meeting_date:
+        payload["meeting_date"] = hook.meeting_date
+    job, created = await get_ingest_queue().submit(hook.meeting_id, payload, hook.priority)
+    return JSONResponse(job, status_code=202 if created else 200)
+
+
+@app.get("/api/hooks/meeting/{meeting_id}")
+async def meeting_hook_status(meeting_id: str):
+    job = await asyncio.to_thread(get_ingest_queue().jobs.get, meeting_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Meeting not found")
+    return job
+
+
+@app.get("/cache/stats")
+async def cache_stats():
+    return get_result_cache().snapshot()
+
+
+def _multi(values):
+    # accept both ?status=a&status=b and ?status=a,b
+    out = [v.strip() for value in values or [] for v in value.split(",") if v.strip()]
+    return out or None
+
+
+def _etag(version, request):
+    # weak validator: store version + the exact query, so every filter/page has its own tag
+    digest = hashlib.sha1(str(request.query_params).encode("utf-8")).hexdigest()[:12]
+    return f'W/"{version}-{digest}"'
+
+
+def _not_modified(request, etag):
+    tags = [t.strip() for t in request.headers.get("If-None-Match", "").split(",")]
+    return etag in tags or "*" in tags
+
+
+@app.get("/api/actions")
+async def list_actions(
+    request: Request,
+    status: List[str] = Query(None),
+    type: List[str] = Query(None),
+    min_confidence: float = None,
+    meeting_id: str = None,
+    sort: str = "created_at",
+    order: str = "desc",
+    limit: int = 100,
+    cursor: str = None,
+    since: int = None,
+):
+    """
+    Filtered, sorted page of stored actions as a JSON list. When more rows
+    match, the X-Next-Cursor header holds the cursor for the next page.
+    X-Sync-Cursor is the store version the response reflects; pass it back
+    as `since` to get only what changed (tombstones for rows that stopped
+    matching). ETag / If-None-Match answers 304 while nothing changed.
+    """
+    store = get_action_store()
+    version = await asyncio.to_thread(store.max_version)
+    etag = _etag(version, request)
+    if _not_modified(request, etag) or (since is not None and since >= version):
+        return Response(status_code=304, headers={"ETag": etag, "X-Sync-Cursor": str(version)})
+
+    filters = (_multi(status), _multi(type), min_confidence, meeting_id)
+    try:
+        if since is not None:
+            items, reached, more = await asyncio.to_thread(store.changes, since, *filters, limit)
+            headers = {"X-Sync-Cursor": str(reached)}
+            if more:
+                headers["X-Next-Cursor"] = str(reached)
+        else:
+            items, next_cursor = await asyncio.to_thread(store.query, *filters, sort, order, limit, cursor)
+            # version read before the query: a concurrent change is re-sent, never missed
+            headers = {"X-Sync-Cursor": str(version)}
+            if next_cursor:
+                headers["X-Next-Cursor"] = next_cursor
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    headers["ETag"] = etag
+    return JSONResponse(items, headers=headers)
+
+
+@app.get("/api/actions/stats")
+async def action_stats(request: Request):
+    store = get_action_store()
+    etag = _etag(await asyncio.to_thread(store.max_version), request)
+    if _not_modified(request, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    return JSONResponse(await asyncio.to_thread(store.counts), headers={"ETag": etag})
+
+
+@app.get("/api/actions/events")
+async def action_events(
+    request: Request,
+    status: List[str] = Query(None),
+    type: List[str] = Query(None),
+    min_confidence: float = None,
+    meeting_id: str = None,
+    since: int = None,
+):
+    """
+    Server-sent events for every change to stored actions: `created`,
+    `updated`, `executed` or `failed` with the action row, or `removed`
+    ({"id"}) when a changed row no longer matches the filters. Each event id
+    is the store version; a reconnect with Last-Event-ID (or `since`)
+    resumes after it. A first `ready` event carries the version the stream
+    starts from.
+    """
+    store = get_action_store()
+    last_event_id = request.headers.get("Last-Event-ID")
+    if last_event_id and last_event_id.isdigit():
+        since = int(last_event_id)
+    if since is None:
+        since = await asyncio.to_thread(store.max_version)
+    filters = (_multi(status), _multi(type), min_confidence, meeting_id)
+
+    async def events():
+        yield "retry: 3000\n" + _sse("ready", {"version": since}, id=since)
+        async for items, version in get_change_feed().follow(since, filters, request.is_disconnected):
+            if not items:
+                yield ": keepalive\n\n"
+            for item in items:
+                if item.get("deleted"):
+                    yield _sse("removed", {"id": item["id"]}, id=item["version"])
+                else:
+                    yield _sse(item["event"], item, id=item["version"])
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+
+class ExecuteRequest(BaseModel):
+    ids: List[str]
+    idempotency_key: str = None
+    # also execute actions flagged as restating an earlier meeting's action (metadata.duplicate_of)
+    allow_duplicates: bool = False
+
+
+def _job_response(job, created):
+    # 202 for a freshly queued job, 200 when an idempotency key matched an earlier one
+    return JSONResponse(job, status_code=202 if created else 200)
+
+
+@app.post("/api/actions/execute")
+async def execute_actions(req: ExecuteRequest, request: Request):
+    """Queue one execution job for `ids`; poll GET /api/jobs/{job_id} for progress."""
+    key = request.headers.get("Idempotency-Key") or req.idempotency_key
+    return _job_response(*await get_execution_engine().submit(req.ids, key, req.allow_duplicates))
+
+
+@app.post("/api/actions/execute_all")
+async def execute_all(request: Request):
+    return _job_response(*await get_execution_engine().submit(None, request.headers.get("Idempotency-Key")))
+
+
+@app.post("/api/actions/{action_id}/execute")
+async def execute_one(action_id: str, request: Request, allow_duplicates: bool = False):
+    key = request.headers.get("Idempotency-Key")
+    return _job_response(*await get_execution_engine().submit([action_id], key, allow_duplicates))
+
+
+@app.get("/api/jobs/{job_id}")
+async def get_job(job_id: str, items: bool = False):
+    job = await asyncio.to_thread(get_execution_engine().jobs.get, job_id, items)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@app.get("/api/actions/{action_id}")
+async def get_action(action_id: str):
+    item = await asyncio.to_thread(get_action_store().get, action_id)
+    if item is None:
+        raise HTTPException(status_code=404, detail="Action not found")
+    return item
+
+
+@app.get("/health")
+async def health():
+    return {"status": "ok", "watsonx_circuit": watsonx_caller.breaker.state}
+
+
+@app.get("/info")
+async def info():
+    return {
+        "service": "nlp-parser",
+        "model_id": DEFAULT_MODEL_ID,
+        "schema_version": SCHEMA_VERSION,
+        "prompt_version": PROMPT_VERSION,
+        "watsonx_configured": bool(os.getenv("WATSONX_APIKEY")),
+        "actions": await asyncio.to_thread(get_action_store().counts),
+    }
 
 
-    return parsed
 
+# scrape-time views of the result cache and the upstream caller
+Counter(
+    "nlp_parser_result_cache_lookups_total", "Result-cache lookups by outcome.", ["result"],
+    fn=lambda: {(k,): get_result_cache().stats[k] for k in ("memory_hits", "disk_hits", "misses")},
+)
+Gauge(
+    "nlp_parser_result_cache_hit_ratio", "Share of result-cache lookups answered from memory or disk.",
+    fn=lambda: {(): get_result_cache().snapshot()["hit_ratio"]},
+)
+Counter(
+    "nlp_parser_upstream_events_total", "Upstream caller events (calls, retries, hedges, short_circuited, deadline_exceeded).",
+    ["upstream", "event"],
+    fn=lambda: {(watsonx_caller.name, k): v for k, v in watsonx_caller.stats.items()},
+)
+Gauge(
+    "nlp_parser_circuit_state", "1 for the circuit breaker's current state.", ["upstream", "state"],
+    fn=lambda: {(watsonx_caller.name, st): int(watsonx_caller.breaker.state == st) for st in ("closed", "open", "half_open")},
+)
+Gauge(
+    "nlp_parser_ingest_queue_depth", "Webhook meetings queued or being parsed, across all workers.", ["status"],
+    fn=lambda: {(k,): v for k, v in get_ingest_queue().jobs.depth().items()},
+)
+Gauge(
+    "nlp_parser_action_event_subscribers", "Open /api/actions/events streams in this worker.",
+    fn=lambda: {(): get_change_feed().subscribers},
+)
+
+
+@app.get("/metrics")
+async def metrics():
+    return Response(render_metrics(), media_type="text/plain; version=0.0.4; charset=utf-8")
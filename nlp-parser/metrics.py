@@ -0,0 +1,127 @@
+"""
+Process-local metrics, rendered in the Prometheus text exposition format by
+GET /metrics. Every uvicorn worker keeps its own numbers, so scrape each
+worker (or run one per container) and aggregate in Prometheus.
+"""
+import bisect, math, threading
+
+
+# seconds; covers sub-millisecond local stages up to a full model call
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+REGISTRY = []
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(pairs):
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+def _number(value):
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    kind = "untyped"
+
+    def __init__(self, name, help, labels=(), fn=None):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        # fn: computed at scrape time, returns {label-values tuple: value}
+        self.fn = fn
+        self._values = {}
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def _key(self, labels):
+        return tuple(str(labels[name]) for name in self.labels)
+
+    def samples(self):
+        values = self.fn() if self.fn else dict(self._values)
+        for key, value in sorted(values.items()):
+            yield self.name, list(zip(self.labels, key)), value
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(Metric):
+    kind = "gauge"
+
+    def set(self, value, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name, help, labels=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            series = self._values.get(key)
+            if series is None:
+                series = self._values[key] = {"counts": [0] * len(self.buckets), "sum": 0.0, "count": 0}
+            i = bisect.bisect_left(self.buckets, value)
+            if i < len(self.buckets):
+                series["counts"][i] += 1
+            series["sum"] += value
+            series["count"] += 1
+
+    def samples(self):
+        with self._lock:
+            items = sorted((k, dict(v, counts=list(v["counts"]))) for k, v in self._values.items())
+        for key, series in items:
+            labels = list(zip(self.labels, key))
+            cumulative = 0
+            for bound, n in zip(self.buckets, series["counts"]):
+                cumulative += n
+                yield self.name + "_bucket", labels + [("le", _number(float(bound)))], cumulative
+            yield self.name + "_bucket", labels + [("le", "+Inf")], series["count"]
+            yield self.name + "_sum", labels, series["sum"]
+            yield self.name + "_count", labels, series["count"]
+
+
+def render():
+    lines = []
+    for metric in REGISTRY:
+        lines.append(f"# HELP {metric.name} {metric.help}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        for name, labels, value in metric.samples():
+            lines.append(f"{name}{_labels(labels)} {_number(value)}")
+    return "\n".join(lines) + "\n"
+
+
+# pipeline metrics; callback metrics for the cache and upstream callers are registered in main.py
+STAGE_SECONDS = Histogram(
+    "nlp_parser_stage_duration_seconds",
+    "Time spent per /parse pipeline stage (iam, rules, prompt, cache, model, extract, validate, total).",
+    ["stage"],
+)
+HTTP_REQUESTS = Counter("nlp_parser_http_requests_total", "HTTP requests by route and status.", ["route", "status"])
+HTTP_SECONDS = Histogram("nlp_parser_http_request_duration_seconds", "Time to response headers by route.", ["route"])
+TOKENS = Counter("nlp_parser_model_tokens_total", "Tokens billed by watsonx (cache hits excluded).", ["kind"])
+MODEL_CALLS_AVOIDED = Counter(
+    "nlp_parser_model_calls_avoided_total", "Parses answered without a model call.", ["reason"]
+)
+ERRORS = Counter("nlp_parser_errors_total", "Failed or degraded parses by cause.", ["cause"])
+REJECTED_ACTIONS = Counter("nlp_parser_rejected_actions_total", "Actions dropped by schema salvage.")
+IAM_REFRESHES = Counter("nlp_parser_iam_refreshes_total", "IAM token fetches from IBM Cloud.", ["result"])
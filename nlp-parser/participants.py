@@ -0,0 +1,204 @@
+"""
+Local assignee resolution. The `[Participants: Alice (Project Manager), ...]`
+header and an optional org directory (ORG_DIRECTORY_PATH, JSON or CSV with
+name, email, role, aliases) are indexed in a character trie over names,
+first/last names, aliases and emails. Assignee names the model or the rules
+reported are completed with email and role, and first-person commitments
+("I'll ...") without an assignee are given to the speaker.
+"""
+import csv, json, os, re
+from functools import lru_cache
+
+
+ORG_DIRECTORY_PATH = os.getenv("ORG_DIRECTORY_PATH")
+
+PARTICIPANTS_RE = re.compile(r"^[ \t]*\[Participants:[ \t]*(?P<value>[^\]]*)\]", re.M | re.I)
+# one header entry: "Alice (Project Manager)" or "Bob Lee <bob@acme.com>"
+ENTRY_RE = re.compile(r"^(?P<name>[^(<]+?)\s*(?:\((?P<role>[^)]*)\))?\s*(?:<(?P<email>[^>]+)>)?$")
+FIRST_PERSON_RE = re.compile(r"\b(?:I['’]ll|I will|I can|I['’]m going to|I am going to|let me)\b", re.I)
+# "Bob, can you ..." / "Bob to open ..." / "Bob will ..."
+ADDRESSEE_RE = re.compile(r"^\s*(?P<name>[A-Z][\w.'-]*(?: [A-Z][\w.'-]*)?)(?:,\s*(?:can|could|would|will) you\b|\s+(?:to|will|should)\b)")
+
+
+def _norm(text):
+    return re.sub(r"\s+", " ", re.sub(r"[^\w@.+ -]", "", (text or "").lower())).strip()
+
+
+def parse_participants(transcript):
+    """People from the [Participants: ...] header: [{"name", "role"?, "email"?}]."""
+    m = PARTICIPANTS_RE.search(transcript or "")
+    if not m:
+        return []
+    people = []
+    # split on commas outside parentheses
+    for entry in re.split(r",\s*(?![^()]*\))", m.group("value")):
+        parsed = ENTRY_RE.match(entry.strip())
+        if not parsed or not parsed.group("name").strip():
+            continue
+        person = {"name": parsed.group("name").strip()}
+        if parsed.group("role"):
+            person["role"] = parsed.group("role").strip()
+        if parsed.group("email"):
+            person["email"] = parsed.group("email").strip()
+        people.append(person)
+    return people
+
+
+class NameTrie:
+    """Character trie from normalized name keys to people; fuzzy lookup by bounded edit distance."""
+
+    def __init__(self):
+        self.root = {}
+
+    def add(self, person, aliases=()):
+        keys = {_norm(person["name"])}
+        keys.update(part for part in _norm(person["name"]).split() if len(part) > 1)
+        keys.update(_norm(a) for a in aliases if a)
+        if person.get("email"):
+            keys.add(person["email"].lower())
+            keys.add(person["email"].lower().split("@")[0])
+        for key in keys:
+            if not key:
+                continue
+            node = self.root
+            for ch in key:
+                node = node.setdefault(ch, {})
+            bucket = node.setdefault(None, [])
+            if person not in bucket:
+                bucket.append(person)
+
+    def exact(self, key):
+        node = self.root
+        for ch in key:
+            node = node.get(ch)
+            if node is None:
+                return []
+        return node.get(None, [])
+
+    def fuzzy(self, key, max_edits):
+        """People under the closest key within `max_edits` (Levenshtein), walking the trie with one DP row per node."""
+        best = [max_edits + 1, []]
+        first_row = list(range(len(key) + 1))
+
+        def walk(node, ch, prev):
+            row = [prev[0] + 1]
+            for i in range(1, len(key) + 1):
+                row.append(min(row[i - 1] + 1, prev[i] + 1, prev[i - 1] + (key[i - 1] != ch)))
+            if None in node and row[-1] <= best[0]:
+                if row[-1] < best[0]:
+                    best[0], best[1] = row[-1], []
+                best[1].extend(p for p in node[None] if p not in best[1])
+            if min(row) <= best[0]:
+                for next_ch, child in node.items():
+                    if next_ch is not None:
+                        walk(child, next_ch, row)
+
+        for ch, child in self.root.items():
+            if ch is not None:
+                walk(child, ch, first_row)
+        return best[1] if best[0] <= max_edits else []
+
+    def lookup(self, name):
+        key = _norm(name)
+        if not key:
+            return []
+        found = self.exact(key)
+        if found:
+            return found
+        # one typo in short names, two in longer ones
+        return self.fuzzy(key, 1 if len(key) <= 5 else 2)
+
+
+def _load_directory(path):
+    if path.lower().endswith(".csv"):
+        with open(path, newline="") as f:
+            rows = list(csv.DictReader(f))
+        for row in rows:
+            row["aliases"] = [a.strip() for a in (row.get("aliases") or "").split(";") if a.strip()]
+        return rows
+    with open(path) as f:
+        return json.load(f)
+
+
+_directory = (None, None)
+
+
+def directory_trie():
+    """The org directory trie, reloaded when the file changes; None without ORG_DIRECTORY_PATH."""
+    global _directory
+    if not ORG_DIRECTORY_PATH or not os.path.exists(ORG_DIRECTORY_PATH):
+        return None
+    mtime = os.path.getmtime(ORG_DIRECTORY_PATH)
+    if _directory[0] != mtime:
+        trie = NameTrie()
+        for row in _load_directory(ORG_DIRECTORY_PATH):
+            if row.get("name"):
+                person = {k: row[k].strip() for k in ("name", "email", "role") if row.get(k)}
+                trie.add(person, row.get("aliases") or ())
+        _directory = (mtime, trie)
+    return _directory[1]
+
+
+@lru_cache(maxsize=256)
+def _participants_trie(header, directory_mtime):
+    directory = directory_trie()
+    trie = NameTrie()
+    for person in parse_participants(header):
+        # the directory fills in what the header leaves out (usually the email)
+        known = directory.lookup(person["name"]) if directory else []
+        if len(known) == 1:
+            person = {**known[0], **person}
+        trie.add(person)
+    return trie
+
+
+class Resolver:
+    def __init__(self, transcript):
+        self.directory = directory_trie()
+        m = PARTICIPANTS_RE.search(transcript or "")
+        self.participants = _participants_trie(m.group(0) if m else "", _directory[0])
+
+    def resolve(self, name):
+        """The one person `name` refers to (meeting participants first), or None when unknown or ambiguous."""
+        for trie in (self.participants, self.directory):
+            if trie is None:
+                continue
+            found = trie.lookup(name)
+            if len(found) == 1:
+                return found[0]
+            if found:
+                return None
+        return None
+
+    def assign(self, action):
+        """resolve_assignees for one action."""
+        assignees = action.get("assignees") or []
+        if not assignees:
+            span = action.get("source_span") or {}
+            context = action.get("context") or ""
+            addressed = ADDRESSEE_RE.match(context) or ADDRESSEE_RE.match(action.get("text") or "")
+            who = addressed.group("name") if addressed else None
+            if who is None and span.get("speaker") and FIRST_PERSON_RE.search(context):
+                who = span["speaker"]
+            person = self.resolve(who) if who else None
+            if person:
+                action["assignees"] = [dict(person)]
+            return action
+        for i, assignee in enumerate(assignees):
+            person = self.resolve(assignee.get("name") or assignee.get("email") or "")
+            if person:
+                assignees[i] = {**assignee, **person}
+        return action
+
+
+def resolve_assignees(actions, transcript):
+    """
+    Complete assignees with the participant's full name, email and role, and
+    assign first-person ("I'll ...") or addressed ("Bob, can you ...")
+    actions that have none. Unknown names are left as reported.
+    """
+    resolver = None
+    for action in actions:
+        resolver = resolver or Resolver(transcript)
+        resolver.assign(action)
+    return actions
@@ -0,0 +1,122 @@
+import json, os, re
+from dataclasses import dataclass
+
+from chunking import estimate_tokens
+from rules import hints_block
+from schema import SCHEMA
+from watsonx_client import SAMPLING_PARAMS
+
+
+# bump when the prompt wording changes so cached responses to the old prompt are not reused
+PROMPT_VERSION = 6
+
+# fields filled in locally from the transcript (align.py, dates.py); the model is not asked for them
+LOCAL_FIELDS = ("source_span", "context", "due_date")
+
+
+def _model_schema():
+    actions = json.loads(json.dumps(SCHEMA["properties"]["actions"]))
+    for field in LOCAL_FIELDS:
+        actions["items"]["properties"].pop(field, None)
+    # participants.py completes email and role from the header and the org directory
+    assignee = actions["items"]["properties"]["assignees"]["items"]
+    assignee["properties"] = {"name": assignee["properties"]["name"]}
+    return actions
+
+
+# built once: minified action schema for every prompt
+SCHEMA_BLOCK = json.dumps(_model_schema(), separators=(",", ":"))
+
+# completion budget: a fixed floor plus a share of the transcript, capped at the old flat limit
+MAX_TOKENS_FLOOR = int(os.getenv("MAX_TOKENS_FLOOR", 512))
+MAX_TOKENS_CAP = int(os.getenv("MAX_TOKENS_CAP", SAMPLING_PARAMS["max_tokens"]))
+MAX_TOKENS_RATIO = float(os.getenv("MAX_TOKENS_RATIO", 0.8))
+
+HEADER_RE = re.compile(r"^[ \t]*\[(?P<label>[^\]:]+)(?::[ \t]*(?P<value>[^\]]*))?\][ \t]*\n?", re.M)
+SEPARATOR_RE = re.compile(r"^[ \t]*(?:-{3,}|={3,}|\*{3,})[ \t]*\n?", re.M)
+FILLER_RE = re.compile(r"\b(?:um+|uh+|erm|hmm+)\b,?[ \t]*|\byou know,[ \t]*", re.I)
+BLANK_RUN_RE = re.compile(r"\n[ \t]*\n(?:[ \t]*\n)+")
+
+
+@dataclass
+class CompactTranscript:
+    text: str
+    context: str  # header facts worth keeping (date, participants), sent outside the transcript block
+
+
+def compact_transcript(transcript):
+    """Drop header lines, separators, filler words and blank-line runs; spans are located in the original by align.py."""
+    removed = []
+    context = []
+    for m in HEADER_RE.finditer(transcript):
+        label = m.group("label").strip().lower()
+        if m.group("value") and label in ("date", "participants"):
+            context.append(f"{m.group('label').strip()}: {m.group('value').strip()}")
+        removed.append((m.start(), m.end()))
+    for regex in (SEPARATOR_RE, FILLER_RE):
+        removed.extend((m.start(), m.end()) for m in regex.finditer(transcript))
+    # keep one blank line between turns
+    removed.extend((m.start() + 1, m.end() - 1) for m in BLANK_RUN_RE.finditer(transcript))
+
+    pieces = []
+    pos = 0
+    for start, end in sorted(removed):
+        if start > pos:
+            pieces.append(transcript[pos:start])
+        pos = max(pos, end)
+    pieces.append(transcript[pos:])
+    return CompactTranscript("".join(pieces).strip(), "; ".join(context))
+
+
+def max_tokens_for(transcript_tokens):
+    return min(MAX_TOKENS_CAP, int(MAX_TOKENS_FLOOR + transcript_tokens * MAX_TOKENS_RATIO))
+
+
+@dataclass
+class Prompt:
+    text: str
+    compact: CompactTranscript
+    params: dict  # sampling params sent to watsonx
+    estimated_tokens: int
+
+    @property
+    def cache_params(self):
+        return {**self.params, "prompt": PROMPT_VERSION}
+
+
+def build_prompt(transcript, hints=None):
+    compact = compact_transcript(transcript)
+    hint_block = ""
+    if hints:
+        hint_block = f"Candidate actions from a rule pass (verify, correct, merge, extend; add what they miss):\n{hints_block(hints)}\n"
+    meeting = f"Meeting: {compact.context}\n" if compact.context else ""
+    text = (
+        f"Extract meeting actions as JSON. Each item of `actions` follows this schema:\n{SCHEMA_BLOCK}\n"
+        "Return ONLY a JSON object with keys: meeting_id, actions. "
+        "Keep each action's text close to the transcript's wording.\n"
+        f"{meeting}{hint_block}"
+        f'Transcript:\n"""{compact.text}"""'
+    )
+    transcript_tokens = estimate_tokens(compact.text)
+    params = {**SAMPLING_PARAMS, "max_tokens": max_tokens_for(transcript_tokens)}
+    return Prompt(text, compact, params, estimate_tokens(text))
+
+
+def usage_report(prompt, model_resp=None, cached=False):
+    usage = (model_resp or {}).get("usage") or {}
+    return {
+        "prompt_tokens": usage.get("prompt_tokens", prompt.estimated_tokens),
+        "completion_tokens": usage.get("completion_tokens", 0),
+        "estimated_prompt_tokens": prompt.estimated_tokens,
+        "max_tokens": prompt.params["max_tokens"],
+        "cached": cached,
+    }
+
+
+def sum_usage(reports):
+    total = {"prompt_tokens": 0, "completion_tokens": 0, "estimated_prompt_tokens": 0, "max_tokens": 0, "cached": True}
+    for r in reports:
+        for k in ("prompt_tokens", "completion_tokens", "estimated_prompt_tokens", "max_tokens"):
+            total[k] += r.get(k, 0)
+        total["cached"] = total["cached"] and r.get("cached", False)
+    return total
@@ -0,0 +1,307 @@
+import asyncio, contextvars, os, random, time
+from collections import deque
+from contextlib import contextmanager, asynccontextmanager
+
+import httpx
+
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+# a timeout this close to the request deadline is blamed on the deadline, not the upstream...
+DEADLINE_SLACK = 0.25
+# ...unless the attempt still had this share of its attempt_timeout
+FULL_ATTEMPT_SHARE = 0.9
+
+
+class DeadlineExceeded(Exception):
+    pass
+
+
+class CircuitOpen(Exception):
+    pass
+
+
+# absolute monotonic deadline for the current request; tasks spawned from it inherit the value
+_deadline = contextvars.ContextVar("deadline", default=None)
+
+
+@contextmanager
+def deadline(seconds):
+    """Bound everything awaited inside the block (including gathered windows) by `seconds`."""
+    current = _deadline.get()
+    new = time.monotonic() + seconds
+    token = _deadline.set(new if current is None else min(current, new))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining(default=None):
+    d = _deadline.get()
+    if d is None:
+        return default
+    return d - time.monotonic()
+
+
+class CircuitBreaker:
+    """
+    closed -> open after `failure_threshold` consecutive upstream failures;
+    open -> half-open after `reset_timeout`, letting one probe through;
+    the probe's outcome closes or re-opens it.
+    """
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self.probing = False
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    def allow(self):
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half_open" and not self.probing:
+            self.probing = True
+            return True
+        return False
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+        self.probing = False
+
+    def record_failure(self):
+        self.failures += 1
+        if self.probing or self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+        self.probing = False
+
+    def release(self):
+        """End a call that says nothing about upstream health; a half-open probe slot is freed."""
+        self.probing = False
+
+
+class LatencyTracker:
+    def __init__(self, size=200):
+        self.samples = deque(maxlen=size)
+
+    def add(self, seconds):
+        self.samples.append(seconds)
+
+    def percentile(self, q, min_samples=20):
+        if len(self.samples) < min_samples:
+            return None
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def _retryable(exc):
+    if isinstance(exc, httpx.HTTPStatusError):
+        return exc.response.status_code in RETRY_STATUSES
+    return isinstance(exc, (httpx.TransportError, httpx.TimeoutException))
+
+
+def _is_timeout(exc):
+    return isinstance(exc, (asyncio.TimeoutError, httpx.TimeoutException))
+
+
+def _unsent(exc):
+    # timed out before the request went out; safe to retry even for calls with side effects
+    return isinstance(exc, (httpx.ConnectTimeout, httpx.PoolTimeout))
+
+
+def _retry_after(exc):
+    if isinstance(exc, httpx.HTTPStatusError):
+        try:
+            return float(exc.response.headers.get("Retry-After"))
+        except (TypeError, ValueError):
+            return None
+    return None
+
+
+class ResilientCaller:
+    """
+    Wraps one upstream. `call(attempt)` runs `attempt(timeout)` with:
+    - the request deadline from `deadline()` capping every attempt
+    - jittered exponential backoff (honouring Retry-After) on retryable errors
+    - a circuit breaker that fails fast while the upstream is unhealthy
+    - optional hedging: a duplicate attempt after the observed p95 latency
+    `retry_timeouts=False` is for calls with side effects: an attempt that timed
+    out after the request was sent may have succeeded, so it is not repeated.
+    """
+
+    def __init__(self, name, max_attempts=3, base_delay=0.5, max_delay=8.0,
+                 breaker=None, hedge=False, hedge_delay=10.0, attempt_timeout=120.0, retry_timeouts=True):
+        self.name = name
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.breaker = breaker or CircuitBreaker()
+        self.hedge = hedge
+        self.hedge_delay = hedge_delay
+        self.attempt_timeout = attempt_timeout
+        self.retry_timeouts = retry_timeouts
+        self.latency = LatencyTracker()
+        self.stats = {"calls": 0, "retries": 0, "hedges": 0, "short_circuited": 0, "deadline_exceeded": 0}
+
+    def _budget(self):
+        left = remaining(self.attempt_timeout)
+        if left <= 0:
+            self.stats["deadline_exceeded"] += 1
+            raise DeadlineExceeded(f"{self.name}: request deadline exceeded")
+        return min(left, self.attempt_timeout)
+
+    def _backoff(self, attempt, retry_after):
+        # "full jitter": uniform in [0, base * 2^attempt], capped
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        return delay
+
+    def _timed_out(self, started):
+        # a timeout that fired while the caller's deadline still had time left, or after the
+        # upstream had (about) its whole attempt_timeout anyway, is the upstream's fault; one
+        # that fired because a short deadline ran out says nothing about its health
+        waited = time.monotonic() - started
+        if remaining(float("inf")) > DEADLINE_SLACK or waited >= self.attempt_timeout * FULL_ATTEMPT_SHARE:
+            self.breaker.record_failure()
+        else:
+            self.breaker.release()
+
+    async def _timed(self, attempt, timeout):
+        started = time.monotonic()
+        result = await asyncio.wait_for(attempt(timeout), timeout)
+        self.latency.add(time.monotonic() - started)
+        return result
+
+    async def _hedged(self, attempt, timeout):
+        delay = self.latency.percentile(0.95) or self.hedge_delay
+        first = asyncio.ensure_future(self._timed(attempt, timeout))
+        done, _ = await asyncio.wait({first}, timeout=min(delay, timeout))
+        if done:
+            return first.result()
+
+        self.stats["hedges"] += 1
+        second = asyncio.ensure_future(self._timed(attempt, max(timeout - delay, 0.001)))
+        pending = {first, second}
+        error = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def call(self, attempt):
+        self.stats["calls"] += 1
+        if not self.breaker.allow():
+            self.stats["short_circuited"] += 1
+            raise CircuitOpen(f"{self.name}: circuit open, upstream unhealthy")
+
+        for n in range(self.max_attempts):
+            try:
+                timeout = self._budget()
+            except DeadlineExceeded:
+                self.breaker.release()
+                raise
+            started = time.monotonic()
+            try:
+                if self.hedge:
+                    result = await self._hedged(attempt, timeout)
+                else:
+                    result = await self._timed(attempt, timeout)
+            except asyncio.CancelledError:
+                self.breaker.release()
+                raise
+            except Exception as e:
+                if not _retryable(e) and not _is_timeout(e):
+                    # 4xx other than 429 is our fault; the upstream answered, so it counts as healthy
+                    self.breaker.record_success()
+                    raise
+                if _is_timeout(e):
+                    self._timed_out(started)
+                    if remaining(self.attempt_timeout) <= 0:
+                        self.stats["deadline_exceeded"] += 1
+                        raise DeadlineExceeded(f"{self.name}: request deadline exceeded")
+                    if not self.retry_timeouts and not _unsent(e):
+                        if isinstance(e, asyncio.TimeoutError):
+                            raise DeadlineExceeded(f"{self.name}: attempt timed out") from e
+                        raise
+                else:
+                    self.breaker.record_failure()
+                error = None if isinstance(e, asyncio.TimeoutError) else e
+                retry_after = _retry_after(e)
+            else:
+                self.breaker.record_success()
+                return result
+
+            if self.breaker.state == "open":
+                self.stats["short_circuited"] += 1
+                raise CircuitOpen(f"{self.name}: circuit open, upstream unhealthy") from error
+            delay = self._backoff(n, retry_after)
+            if n == self.max_attempts - 1 or delay >= remaining(float("inf")):
+                if error is None:
+                    raise DeadlineExceeded(f"{self.name}: attempt timed out")
+                raise error
+            self.stats["retries"] += 1
+            await asyncio.sleep(delay)
+
+    @asynccontextmanager
+    async def guard(self):
+        """Breaker and deadline bookkeeping for calls that cannot be retried (streams); yields the time budget."""
+        self.stats["calls"] += 1
+        if not self.breaker.allow():
+            self.stats["short_circuited"] += 1
+            raise CircuitOpen(f"{self.name}: circuit open, upstream unhealthy")
+        try:
+            budget = self._budget()
+        except DeadlineExceeded:
+            self.breaker.release()
+            raise
+        started = time.monotonic()
+        try:
+            yield budget
+        except (asyncio.CancelledError, DeadlineExceeded):
+            self.breaker.release()
+            raise
+        except Exception as e:
+            if _is_timeout(e):
+                self._timed_out(started)
+            elif _retryable(e):
+                self.breaker.record_failure()
+            else:
+                self.breaker.record_success()
+            raise
+        else:
+            self.breaker.record_success()
+
+
+def from_env(name, prefix, attempt_timeout, retry_timeouts=True):
+    return ResilientCaller(
+        name,
+        max_attempts=int(os.getenv(f"{prefix}_MAX_ATTEMPTS", 3)),
+        base_delay=float(os.getenv(f"{prefix}_BACKOFF_BASE", 0.5)),
+        max_delay=float(os.getenv(f"{prefix}_BACKOFF_MAX", 8)),
+        breaker=CircuitBreaker(
+            failure_threshold=int(os.getenv(f"{prefix}_BREAKER_FAILURES", 5)),
+            reset_timeout=float(os.getenv(f"{prefix}_BREAKER_RESET", 30)),
+        ),
+        hedge=os.getenv(f"{prefix}_HEDGE", "0").lower() in ("1", "true", "yes"),
+        hedge_delay=float(os.getenv(f"{prefix}_HEDGE_DELAY", 10)),
+        attempt_timeout=attempt_timeout,
+        retry_timeouts=os.getenv(f"{prefix}_RETRY_TIMEOUTS", "1" if retry_timeouts else "0").lower() in ("1", "true", "yes"),
+    )
@@ -0,0 +1,158 @@
+import asyncio, hashlib, json, os, sqlite3, threading, time, unicodedata
+from collections import OrderedDict
+
+
+DATA_DIR = os.getenv("NLP_PARSER_DATA_DIR", os.path.join(os.path.dirname(__file__), "data"))
+
+
+def normalize_transcript(text):
+    text = unicodedata.normalize("NFC", text)
+    return text.replace("\r\n", "\n").replace("\r", "\n").strip()
+
+
+def cache_key(transcript, schema_version, model_id, params):
+    """Content address for one model call: same inputs -> same key, in any process."""
+    material = json.dumps(
+        {
+            "transcript": normalize_transcript(transcript),
+            "schema": schema_version,
+            "model_id": model_id,
+            "params": params,
+        },
+        sort_keys=True,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+class MemoryLRU:
+    def __init__(self, max_entries, ttl):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            stored_at, value = item
+            if time.time() - stored_at > self.ttl:
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def put(self, key, value, stored_at=None):
+        with self._lock:
+            self._data[key] = (stored_at or time.time(), value)
+            self._data.move_to_end(key)
+            evicted = 0
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                evicted += 1
+            return evicted
+
+
+class SQLiteTier:
+    """Persistent tier shared by every worker process on the host (WAL mode)."""
+
+    def __init__(self, path, ttl, max_bytes):
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=10, isolation_level=None)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS parse_cache (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                )"""
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS parse_cache_accessed ON parse_cache(accessed_at)")
+
+    def get(self, key):
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM parse_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None, None
+            if now - row[1] > self.ttl:
+                self._conn.execute("DELETE FROM parse_cache WHERE key = ?", (key,))
+                return None, None
+            self._conn.execute("UPDATE parse_cache SET accessed_at = ? WHERE key = ?", (now, key))
+        return json.loads(row[0]), row[1]
+
+    def put(self, key, value):
+        payload = json.dumps(value, separators=(",", ":"))
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO parse_cache (key, value, size, created_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                (key, payload, len(payload), now, now),
+            )
+            return self._evict(now)
+
+    def _evict(self, now):
+        # TTL first, then least-recently-used rows until under the byte budget
+        evicted = self._conn.execute("DELETE FROM parse_cache WHERE created_at < ?", (now - self.ttl,)).rowcount
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM parse_cache").fetchone()[0]
+        if total <= self.max_bytes:
+            return evicted
+        excess = total - self.max_bytes
+        freed = 0
+        victims = []
+        for key, size in self._conn.execute("SELECT key, size FROM parse_cache ORDER BY accessed_at"):
+            victims.append((key,))
+            freed += size
+            if freed >= excess:
+                break
+        self._conn.executemany("DELETE FROM parse_cache WHERE key = ?", victims)
+        return evicted + len(victims)
+
+
+class ResultCache:
+    """Two-tier (in-process LRU -> SQLite) cache of raw watsonx responses."""
+
+    def __init__(self, path=None, max_entries=None, max_bytes=None, ttl=None):
+        ttl = ttl or float(os.getenv("RESULT_CACHE_TTL", 7 * 24 * 3600))
+        self.memory = MemoryLRU(max_entries or int(os.getenv("RESULT_CACHE_MAX_ENTRIES", 512)), ttl)
+        self.disk = SQLiteTier(
+            path or os.getenv("RESULT_CACHE_PATH", os.path.join(DATA_DIR, "parse_cache.db")),
+            ttl,
+            max_bytes or int(os.getenv("RESULT_CACHE_MAX_BYTES", 256 * 1024 * 1024)),
+        )
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+
+    async def get(self, key):
+        value = self.memory.get(key)
+        if value is not None:
+            self.stats["memory_hits"] += 1
+            return value
+        value, stored_at = await asyncio.to_thread(self.disk.get, key)
+        if value is not None:
+            self.stats["disk_hits"] += 1
+            self.stats["evictions"] += self.memory.put(key, value, stored_at)
+            return value
+        self.stats["misses"] += 1
+        return None
+
+    async def put(self, key, value):
+        self.stats["stores"] += 1
+        self.stats["evictions"] += self.memory.put(key, value)
+        self.stats["evictions"] += await asyncio.to_thread(self.disk.put, key, value)
+
+    def snapshot(self):
+        lookups = self.stats["memory_hits"] + self.stats["disk_hits"] + self.stats["misses"]
+        hits = lookups - self.stats["misses"]
+        return {**self.stats, "hit_ratio": round(hits / lookups, 4) if lookups else 0.0}
@@ -0,0 +1,202 @@
+import os, re
+from dataclasses import dataclass
+
+from chunking import split_turns, TURN_RE
+
+
+# skip the model only when every action-bearing sentence was explained by a rule
+RULES_SKIP_COVERAGE = float(os.getenv("RULES_SKIP_COVERAGE", 1.0))
+# above the 0.75 every bare commitment gets, so a lone generic "I will ..." still goes to the model
+RULES_SKIP_CONFIDENCE = float(os.getenv("RULES_SKIP_CONFIDENCE", 0.8))
+
+APOS = "['’]"
+# a sentence ends at . ! ? followed by a capitalised word, a blank line or the end
+# (so "client@acme.com" and "10 a.m. to review" stay in one piece)
+SENTENCE_RE = re.compile(r"\S.*?(?:[.!?]+(?=\s+[A-Z\"“‘']|\s*$)|(?=\n\s*\n)|\Z)", re.S)
+END = r"[.!?]*\s*$"
+COMMIT_RE = re.compile(rf"\bI(?:{APOS}ll| will)\s+(?P<body>.+?)(?=\s*(?:[—;]|\bI{APOS}ll\b|\bI will\b|{END}))", re.I | re.S)
+OBLIGATION_RE = re.compile(rf"\bwe (?:need|have) to\s+(?P<body>.+?)(?=\s*(?:[—;]|{END}))", re.I | re.S)
+MEETING_RE = re.compile(
+    rf"\b(?:let{APOS}s|we should|I{APOS}ll|I will)\s+(?P<body>(?:set up|schedule|book|organi[sz]e)\s+(?:a\s+|an\s+)?"
+    rf"(?:[\w-]+\s+){{0,2}}(?:meeting|call|sync|review|check-in)\b.*?)(?=\s*{END})",
+    re.I | re.S,
+)
+MEETING_WORD_RE = re.compile(r"\b(?:meeting|call|sync|check-in|invite|calendar)\b", re.I)
+# sentences that usually carry an action; used to measure rule coverage
+CUE_RE = re.compile(rf"\b(?:I{APOS}ll|I will|we need to|we have to|let{APOS}s|can you|could you|please|action item|follow[- ]up)\b", re.I)
+# decisions, open questions and agreements: schema items the rules never extract, so they always count as uncovered
+OPEN_CUE_RE = re.compile(
+    r"\?|\b(?:decided|decision|agreed|agreement|approved|signed off|go(?:ing)? with|settled on|concluded)\b", re.I
+)
+
+EMAIL_RE = re.compile(r"[\w.+-]+@[\w-]+(?:\.[\w-]+)+")
+JIRA_PROJECT_RE = re.compile(r"\bproject\s+(?P<key>[A-Z][A-Z0-9]{1,9})\b")
+JIRA_ISSUE_RE = re.compile(r"\b(?P<key>[A-Z][A-Z0-9]{1,9})-\d+\b")
+DEADLINE_RE = re.compile(
+    r"\b(?:by|before|on|until)\s+(?:end of (?:day|week|month)|eod|eow|today|tomorrow|tonight|"
+    r"(?:next\s+)?(?:mon|tues|wednes|thurs|fri|satur|sun)day)\b|\b(?:today|tomorrow|next week)\b",
+    re.I,
+)
+VAGUE_RE = re.compile(r"^(?:handle|do|take care of|look into|own|cover)\s+(?:that|it|this)\b", re.I)
+PRONOUN_OBJECT_RE = re.compile(r"^\w+\s+(?:it|that|this|them)\b", re.I)
+
+# verbs that map cleanly onto a connector get more confidence than generic ones
+CONCRETE_VERBS = {"email", "send", "open", "create", "file", "schedule", "book", "invite", "set", "assign", "tag", "share", "update"}
+STOPWORDS = {"the", "a", "an", "to", "for", "of", "and", "or", "on", "in", "our", "my", "we", "it", "that", "this", "by", "with", "i"}
+
+
+@dataclass
+class RuleResult:
+    actions: list
+    coverage: float
+    confidence: float
+    cue_sentences: int = 0
+
+    @property
+    def confident(self):
+        return bool(self.actions) and self.coverage >= RULES_SKIP_COVERAGE and self.confidence >= RULES_SKIP_CONFIDENCE
+
+
+def _content_words(text):
+    return {w for w in re.findall(r"[a-z0-9@.]+", text.lower()) if w not in STOPWORDS and len(w) > 2}
+
+
+def _clean(body):
+    body = body.strip().rstrip(",")
+    return body[:1].upper() + body[1:]
+
+
+def _confidence(body, sentence):
+    verb = body.split()[0].lower() if body.split() else ""
+    score = 0.75 + (0.1 if verb in CONCRETE_VERBS else 0) + (0.05 if DEADLINE_RE.search(sentence) else 0)
+    if EMAIL_RE.search(body) or JIRA_PROJECT_RE.search(body) or JIRA_ISSUE_RE.search(body):
+        score += 0.05
+    return round(min(score, 0.95), 2)
+
+
+def _annotate(action, text):
+    # connector hints: tags drive routing in the action store, metadata carries the specifics
+    tags = action.setdefault("tags", [])
+    meta = action.setdefault("metadata", {})
+    emails = EMAIL_RE.findall(text)
+    if emails or re.search(r"\b(?:e-?mail|send)\b", text, re.I):
+        tags.append("email")
+        if emails:
+            meta["recipients"] = sorted(set(meta.get("recipients", []) + emails))
+    projects = [m.group("key") for m in JIRA_PROJECT_RE.finditer(text)] + [m.group("key") for m in JIRA_ISSUE_RE.finditer(text)]
+    if projects or re.search(r"\b(?:jira|ticket)\b", text, re.I):
+        tags.append("jira")
+        if projects:
+            meta["jira_project"] = projects[0]
+    if MEETING_WORD_RE.search(text):
+        tags.append("calendar")
+    deadline = DEADLINE_RE.search(text)
+    if deadline:
+        meta["due_phrase"] = deadline.group(0)
+    action["tags"] = sorted(set(tags))
+    meta["source"] = "rules"
+
+
+def _action(body, kind, speaker, start, end, sentence, confidence):
+    action = {
+        "id": "",
+        "text": _clean(body),
+        "type": "action",
+        "confidence": confidence,
+        "source_span": {"start_char": start, "end_char": end},
+        "context": sentence.strip(),
+    }
+    if speaker:
+        action["assignees"] = [{"name": speaker}]
+        action["source_span"]["speaker"] = speaker
+    _annotate(action, body)
+    action["metadata"]["rule"] = kind
+    return action
+
+
+def extract(transcript):
+    """Run the rule pass over a transcript in the demo format and return schema-shaped candidate actions."""
+    actions = []
+    cue_total = cue_covered = 0
+
+    for turn_start, turn_end in split_turns(transcript):
+        m = TURN_RE.match(transcript, turn_start)
+        if m is None:
+            continue  # header / separators
+        speaker = m.group("speaker").strip()
+        turn_actions = []
+        obligations = []
+        vague_owner = False
+
+        for sm in SENTENCE_RE.finditer(transcript, m.end(), turn_end):
+            sentence = sm.group(0)
+            s0 = sm.start()
+            has_cue = bool(CUE_RE.search(sentence))
+            found = False
+
+            meeting = MEETING_RE.search(sentence)
+            if meeting:
+                body = meeting.group("body")
+                turn_actions.append(_action(body, "meeting", speaker, s0 + meeting.start("body"), s0 + meeting.end("body"), sentence, _confidence("schedule", sentence)))
+                found = True
+
+            for cm in COMMIT_RE.finditer(sentence):
+                body = cm.group("body")
+                if meeting and cm.start() >= meeting.start() and cm.start() < meeting.end():
+                    continue
+                if VAGUE_RE.match(body):
+                    vague_owner = found = True
+                    continue
+                start, end = s0 + cm.start("body"), s0 + cm.end("body")
+                previous = turn_actions[-1] if turn_actions else None
+                if previous is not None and PRONOUN_OBJECT_RE.match(body):
+                    # "I'll tag it under project ONB": refines the action just committed to
+                    previous["text"] += f"; {body}"
+                    previous["source_span"]["end_char"] = end
+                    previous["context"] = transcript[previous["source_span"]["start_char"]:end]
+                    previous["confidence"] = max(previous["confidence"], _confidence(body, sentence))
+                    _annotate(previous, body)
+                else:
+                    turn_actions.append(_action(body, "commitment", speaker, start, end, sentence, _confidence(body, sentence)))
+                found = True
+
+            for om in OBLIGATION_RE.finditer(sentence):
+                obligations.append((om, s0, sentence))
+                found = True
+
+            if has_cue:
+                cue_total += 1
+                cue_covered += found
+            if OPEN_CUE_RE.search(sentence):
+                cue_total += 1
+
+        for om, s0, sentence in obligations:
+            words = _content_words(om.group("body"))
+            # "we need to send the contract ... I'll email the contract": same action, keep the concrete one
+            if any(words & _content_words(a["text"]) for a in turn_actions):
+                continue
+            action = _action(om.group("body"), "obligation", speaker if vague_owner else None,
+                             s0 + om.start("body"), s0 + om.end("body"), sentence, 0.75 if vague_owner else 0.6)
+            turn_actions.append(action)
+
+        actions.extend(turn_actions)
+
+    actions.sort(key=lambda a: a["source_span"]["start_char"])
+    for n, action in enumerate(actions, start=1):
+        action["id"] = f"r{n}"
+
+    return RuleResult(
+        actions=actions,
+        coverage=round(cue_covered / cue_total, 3) if cue_total else 0.0,
+        confidence=min((a["confidence"] for a in actions), default=0.0),
+        cue_sentences=cue_total,
+    )
+
+
+def hints_block(actions):
+    """Compact one-line-per-candidate block for the prompt."""
+    lines = []
+    for a in actions:
+        who = ", ".join(x["name"] for x in a.get("assignees", [])) or "?"
+        lines.append(f'- {a["id"]} [{who}] {a["text"]}')
+    return "\n".join(lines)
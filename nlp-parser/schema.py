@@ -0,0 +1,65 @@
+import copy, hashlib, json, os
+from jsonschema import Draft7Validator
+from jsonschema.exceptions import best_match
+
+
+# Load your schema (use uploaded path)
+SCHEMA_PATH = os.path.join(os.path.dirname(__file__), "meeting_action_schema.json")
+
+
+with open(SCHEMA_PATH, "rb") as f:
+    _schema_bytes = f.read()
+SCHEMA = json.loads(_schema_bytes)
+# part of the result-cache key, so editing the schema invalidates old entries
+SCHEMA_VERSION = hashlib.sha256(_schema_bytes).hexdigest()[:12]
+
+ACTION_SCHEMA = SCHEMA["properties"]["actions"]["items"]
+
+# validators are built once at import; a broken schema fails startup, not a request
+Draft7Validator.check_schema(SCHEMA)
+DOCUMENT_VALIDATOR = Draft7Validator(SCHEMA)
+ACTION_VALIDATOR = Draft7Validator(ACTION_SCHEMA)
+
+# the document minus per-item rules, so salvage can check the envelope and the actions separately
+_shell = copy.deepcopy(SCHEMA)
+_shell["properties"]["actions"].pop("items", None)
+SHELL_VALIDATOR = Draft7Validator(_shell)
+
+
+def action_errors(action):
+    return [
+        f"{'/'.join(str(p) for p in e.absolute_path) or '<action>'}: {e.message}"
+        for e in ACTION_VALIDATOR.iter_errors(action)
+    ]
+
+
+def check_document(parsed, salvage=True):
+    """
+    Validate a parsed document in place.
+
+    Strict mode raises the best-matching ValidationError. Salvage mode only
+    raises for envelope errors (meeting_id, actions not an array, ...); actions
+    that fail their item schema are moved into `rejected_actions` together with
+    the reasons, and the valid ones are kept.
+    """
+    if not salvage:
+        error = best_match(DOCUMENT_VALIDATOR.iter_errors(parsed))
+        if error is not None:
+            raise error
+        return []
+
+    error = best_match(SHELL_VALIDATOR.iter_errors(parsed))
+    if error is not None:
+        raise error
+
+    kept, rejected = [], []
+    for index, action in enumerate(parsed.get("actions", [])):
+        errors = action_errors(action)
+        if errors:
+            rejected.append({"index": index, "action": action, "errors": errors})
+        else:
+            kept.append(action)
+    if rejected:
+        parsed["actions"] = kept
+        parsed.setdefault("rejected_actions", []).extend(rejected)
+    return rejected
@@ -0,0 +1,186 @@
+"""
+Live transcript sessions: the meeting's transcript arrives as deltas while it
+is still running. A speaker turn counts as complete once the next one starts;
+whenever SESSION_WINDOW_TOKENS of completed turns have piled up, only those
+turns (plus CHUNK_OVERLAP_TOKENS of earlier context) are extracted, in the
+background. The merged action set keeps stable ids, so ending the meeting
+only has to extract the last few turns.
+
+Sessions live in the memory of the worker process that created them; route
+a meeting's deltas to one worker (sticky sessions) when running several.
+"""
+import asyncio, os, time
+
+from chunking import (
+    CHARS_PER_TOKEN, CHUNK_OVERLAP_TOKENS, CHUNK_TOKEN_BUDGET, Window,
+    find_duplicate, shift_spans, sort_by_span, split_turns,
+)
+from prompt import sum_usage
+
+
+SESSION_WINDOW_TOKENS = int(os.getenv("SESSION_WINDOW_TOKENS", CHUNK_TOKEN_BUDGET // 2))
+# sessions with no delta for this long are dropped (the meeting client went away without ending)
+SESSION_IDLE_S = float(os.getenv("SESSION_IDLE_S", 4 * 3600))
+
+
+class LiveSession:
+    def __init__(self, meeting_id, options):
+        self.meeting_id = meeting_id
+        self.options = options
+        self.transcript = ""
+        self.seq = -1
+        self.parsed_upto = 0  # transcript offset up to which extraction has run
+        self.windows = 0
+        self.actions = []
+        self.rejected = []
+        self.usage = []
+        self.next_id = 1
+        self.error = None
+        self.task = None
+        self.lock = asyncio.Lock()  # one extraction at a time, in transcript order
+        self.created_at = self.updated_at = time.time()
+
+    def append(self, text, seq=None):
+        """Add a delta; a `seq` at or below the last one is a retried delivery and is ignored."""
+        if seq is not None:
+            if seq <= self.seq:
+                return False
+            self.seq = seq
+        self.transcript += text
+        self.updated_at = time.time()
+        return True
+
+    def next_window(self, final=False):
+        """
+        The next Window to extract, or None. Only completed turns count until
+        `final`; a window starts at a turn boundary inside the overlap before
+        `parsed_upto` and ends at the last turn boundary within the budget.
+        """
+        turns = split_turns(self.transcript)
+        # the last turn may still be growing
+        done = len(self.transcript) if final else (turns[-1][0] if len(turns) > 1 else 0)
+        fresh = done - self.parsed_upto
+        if fresh <= 0 or not self.transcript[self.parsed_upto:done].strip():
+            return None
+        if not final and fresh < SESSION_WINDOW_TOKENS * CHARS_PER_TOKEN:
+            return None
+
+        budget = CHUNK_TOKEN_BUDGET * CHARS_PER_TOKEN
+        ends = [e for s, e in turns if self.parsed_upto < e <= min(done, self.parsed_upto + budget)]
+        end = ends[-1] if ends else done
+        overlap = CHUNK_OVERLAP_TOKENS * CHARS_PER_TOKEN
+        starts = [s for s, e in turns if self.parsed_upto - overlap <= s <= self.parsed_upto]
+        start = starts[0] if starts else self.parsed_upto
+        return Window(self.windows, start, end, self.transcript[start:end])
+
+    def merge(self, window, parsed):
+        """Fold one window's document into the action set; a restated action keeps its id."""
+        earlier = list(self.actions)
+        for action in parsed.get("actions", []):
+            action = shift_spans(action, window.start)
+            # only the overlap before parsed_upto was extracted before
+            dup = find_duplicate(earlier, action, (window.start, self.parsed_upto))
+            if dup is None:
+                action["id"] = f"a{self.next_id}"
+                self.next_id += 1
+                self.actions.append(action)
+            elif action.get("confidence", 0) > dup.get("confidence", 0):
+                action["id"] = dup["id"]
+                self.actions[self.actions.index(dup)] = action
+                earlier[earlier.index(dup)] = action
+        sort_by_span(self.actions)
+        self.rejected += [dict(r, window=window.index) for r in parsed.get("rejected_actions", [])]
+        self.usage.append(parsed.get("usage", {}))
+        self.parsed_upto = window.end
+        self.windows += 1
+
+    def document(self):
+        doc = {"meeting_id": self.meeting_id, "actions": list(self.actions), "usage": sum_usage(self.usage)}
+        if self.rejected:
+            doc["rejected_actions"] = list(self.rejected)
+        return doc
+
+    def snapshot(self, actions=False):
+        out = {
+            "meeting_id": self.meeting_id,
+            "received_chars": len(self.transcript),
+            "parsed_chars": self.parsed_upto,
+            "windows": self.windows,
+            "action_count": len(self.actions),
+            "extracting": self.task is not None and not self.task.done(),
+            "error": self.error,
+            "seq": self.seq if self.seq >= 0 else None,
+        }
+        if actions:
+            out["actions"] = self.actions
+        return out
+
+
+class SessionManager:
+    """
+    `extract(text, session)` -> validated document for one window (the normal
+    single-window pipeline).
+    """
+
+    def __init__(self, extract):
+        self.extract = extract
+        self.sessions = {}
+
+    def get(self, meeting_id):
+        return self.sessions.get(meeting_id)
+
+    def open(self, meeting_id, options=None):
+        """The live session for `meeting_id`, created with `options` if there is none."""
+        self._expire()
+        session = self.sessions.get(meeting_id)
+        if session is None:
+            session = self.sessions[meeting_id] = LiveSession(meeting_id, options or {})
+        return session
+
+    def _expire(self):
+        cutoff = time.time() - SESSION_IDLE_S
+        for meeting_id, session in list(self.sessions.items()):
+            if session.updated_at < cutoff:
+                if session.task:
+                    session.task.cancel()
+                del self.sessions[meeting_id]
+
+    def push(self, session, text, seq=None):
+        """Append a delta and start background extraction when a window is ready."""
+        accepted = session.append(text, seq)
+        if session.task is None or session.task.done():
+            if session.next_window() is not None:
+                session.task = asyncio.ensure_future(self._drain(session))
+        return accepted
+
+    async def _drain(self, session, final=False):
+        async with session.lock:
+            while True:
+                window = session.next_window(final)
+                if window is None:
+                    return
+                try:
+                    parsed = await self.extract(window.text, session)
+                except Exception as e:
+                    # left unparsed: the next delta (or the end of the meeting) retries the window
+                    session.error = getattr(e, "detail", None) or str(e) or type(e).__name__
+                    if final:
+                        raise
+                    return
+                session.error = None
+                session.merge(window, parsed)
+
+    async def close(self, meeting_id):
+        """Extract whatever is left (the last turns included) and return the merged document."""
+        session = self.sessions[meeting_id]
+        if session.task is not None:
+            await asyncio.gather(session.task, return_exceptions=True)
+        await self._drain(session, final=True)
+        del self.sessions[meeting_id]
+        return session.document()
+
+    async def stop(self):
+        tasks = [s.task for s in self.sessions.values() if s.task]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
@@ -0,0 +1,63 @@
+import contextvars, os, time
+from contextlib import contextmanager, nullcontext
+
+from metrics import STAGE_SECONDS
+
+try:
+    from opentelemetry import trace
+except ImportError:
+    trace = None
+
+
+# PARSE_TRACING=1 opens an OpenTelemetry span per stage; exporters are configured the usual
+# OTel way (opentelemetry-instrument / OTEL_* env), without an SDK the spans are no-ops
+TRACING = trace is not None and os.getenv("PARSE_TRACING", "0").lower() in ("1", "true", "yes")
+_tracer = trace.get_tracer("nlp-parser") if TRACING else None
+
+
+# per-request {stage: seconds}; gathered windows share the parent's dict, so their times add up
+_timings = contextvars.ContextVar("stage_timings", default=None)
+
+
+@contextmanager
+def collect():
+    timings = {}
+    token = _timings.set(timings)
+    try:
+        yield timings
+    finally:
+        _timings.reset(token)
+
+
+@contextmanager
+def stage(name):
+    span = _tracer.start_as_current_span(f"parse.{name}") if _tracer else nullcontext()
+    started = time.perf_counter()
+    try:
+        with span:
+            yield
+    finally:
+        elapsed = time.perf_counter() - started
+        STAGE_SECONDS.observe(elapsed, stage=name)
+        timings = _timings.get()
+        if timings is not None:
+            timings[name] = timings.get(name, 0.0) + elapsed
+
+
+def server_timing(timings):
+    """Render as a Server-Timing header value (durations in ms)."""
+    return ", ".join(f"{name};dur={seconds * 1000:.1f}" for name, seconds in timings.items())
+
+
+def parse_server_timing(value):
+    out = {}
+    for part in (value or "").split(","):
+        name, _, params = part.strip().partition(";")
+        for param in params.split(";"):
+            key, _, dur = param.partition("=")
+            if name and key.strip() == "dur":
+                try:
+                    out[name] = float(dur) / 1000
+                except ValueError:
+                    pass
+    return out
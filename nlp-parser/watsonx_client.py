@@ -0,0 +1,159 @@
+import os, json
+import httpx
+
+
+# both overridable so load tests can point at fake_watsonx.py instead of IBM Cloud
+IAM_URL = os.getenv("IAM_URL", "https://iam.cloud.ibm.com/identity/token")
+# Correct watsonx.ai text-chat endpoint from Prompt Lab (base URL; WATSONX_ENDPOINT overrides it)
+DEFAULT_WATSONX_URL = "https://us-south.ml.cloud.ibm.com"
+WATSONX_API_VERSION = os.getenv("WATSONX_API_VERSION", "2023-05-29")
+
+# 👇 Use your actual project ID from watsonx.ai Prompt Lab
+DEFAULT_PROJECT_ID = "a17cc766-44a8-40b9-ab15-a6762c3b8c4e"
+# 👇 You can use the same model you saw in Prompt Lab
+DEFAULT_MODEL_ID = "meta-llama/llama-3-3-70b-instruct"
+SAMPLING_PARAMS = {"max_tokens": 2000, "temperature": 0.2, "top_p": 1}
+
+
+def _env_float(name, default):
+    return float(os.getenv(name, default))
+
+
+def _timeout(prefix, read_default):
+    # connect / read / write / pool timeouts, overridable per upstream via env
+    return httpx.Timeout(
+        connect=_env_float(f"{prefix}_CONNECT_TIMEOUT", 5),
+        read=_env_float(f"{prefix}_READ_TIMEOUT", read_default),
+        write=_env_float(f"{prefix}_WRITE_TIMEOUT", 10),
+        pool=_env_float(f"{prefix}_POOL_TIMEOUT", 10),
+    )
+
+
+IAM_TIMEOUT = _timeout("IAM", 10)
+WATSONX_TIMEOUT = _timeout("WATSONX", 120)
+
+# one pool per worker; sized so dozens of model calls can be in flight at once
+POOL_LIMITS = httpx.Limits(
+    max_connections=int(os.getenv("HTTP_MAX_CONNECTIONS", 100)),
+    max_keepalive_connections=int(os.getenv("HTTP_MAX_KEEPALIVE", 20)),
+    keepalive_expiry=_env_float("HTTP_KEEPALIVE_EXPIRY", 60),
+)
+
+
+_client = None
+
+
+def get_client():
+    """Shared keep-alive AsyncClient, created lazily inside the running loop."""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(limits=POOL_LIMITS, timeout=WATSONX_TIMEOUT)
+    return _client
+
+
+async def close_client():
+    global _client
+    if _client is not None and not _client.is_closed:
+        await _client.aclose()
+    _client = None
+
+
+async def fetch_iam_token(api_key):
+    """Exchange an IBM Cloud API key for an IAM token; returns the raw IAM response."""
+    resp = await get_client().post(
+        IAM_URL,
+        data={
+            "grant_type": "urn:ibm:params:oauth:grant-type:apikey",
+            "apikey": api_key,
+        },
+        headers={"Content-Type": "application/x-www-form-urlencoded"},
+        timeout=IAM_TIMEOUT,
+    )
+    resp.raise_for_status()
+    return resp.json()
+
+
+def watsonx_url(endpoint_url, path):
+    # accept either a bare base URL or a full endpoint URL copied from Prompt Lab
+    base = (endpoint_url or DEFAULT_WATSONX_URL).split("/ml/")[0].rstrip("/")
+    return f"{base}/ml/v1/text/{path}?version={WATSONX_API_VERSION}"
+
+
+def build_chat_body(prompt, project_id=None, params=None):
+    return {
+        "messages": [
+            {
+                "role": "system",
+                "content": "You extract meeting actions as JSON. Respond only with valid JSON."
+            },
+            {
+                "role": "user",
+                "content": prompt
+            }
+        ],
+        "project_id": project_id or DEFAULT_PROJECT_ID,
+        "model_id": DEFAULT_MODEL_ID,
+        **(params or SAMPLING_PARAMS),
+    }
+
+
+# helper: call watsonx.ai chat endpoint over the pooled client
+def _attempt_timeout(timeout):
+    # a caller-supplied budget (seconds left before the request deadline) caps the configured timeouts
+    if timeout is None:
+        return WATSONX_TIMEOUT
+    return httpx.Timeout(
+        connect=min(timeout, WATSONX_TIMEOUT.connect),
+        read=min(timeout, WATSONX_TIMEOUT.read),
+        write=min(timeout, WATSONX_TIMEOUT.write),
+        pool=min(timeout, WATSONX_TIMEOUT.pool),
+    )
+
+
+async def call_watsonx(prompt, iam_token, endpoint_url, project_id, params=None, timeout=None):
+    url = watsonx_url(endpoint_url, "chat")
+
+    headers = {
+        "Accept": "application/json",
+        "Content-Type": "application/json",
+        "Authorization": f"Bearer {iam_token}"
+    }
+
+    body = build_chat_body(prompt, project_id, params)
+
+    r = await get_client().post(url, headers=headers, json=body, timeout=_attempt_timeout(timeout))
+    r.raise_for_status()
+    return r.json()
+
+
+async def stream_watsonx(prompt, iam_token, endpoint_url, project_id, params=None, usage=None, timeout=None):
+    """
+    Chat streaming mode: yields assistant content deltas as the model produces
+    them. If the stream reports token usage it is copied into `usage`.
+    """
+    headers = {
+        "Accept": "text/event-stream",
+        "Content-Type": "application/json",
+        "Authorization": f"Bearer {iam_token}"
+    }
+    body = build_chat_body(prompt, project_id, params)
+
+    async with get_client().stream(
+        "POST", watsonx_url(endpoint_url, "chat_stream"), headers=headers, json=body, timeout=_attempt_timeout(timeout)
+    ) as r:
+        r.raise_for_status()
+        async for line in r.aiter_lines():
+            if not line.startswith("data:"):
+                continue
+            data = line[5:].strip()
+            if not data or data == "[DONE]":
+                continue
+            try:
+                event = json.loads(data)
+                if usage is not None and event.get("usage"):
+                    usage.update(event["usage"])
+                delta = event["choices"][0]["delta"].get("content")
+            except (ValueError, KeyError, IndexError, AttributeError):
+                continue
+            if delta:
+                yield delta